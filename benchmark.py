@@ -0,0 +1,674 @@
+"""
+Synthetic data generator and load benchmark for The Helping Hand.
+
+Point DATABASE_URL at a scratch database (SQLite file or a local PostgreSQL),
+fill it with realistic volume, then time the read-heavy routes through the
+Flask test client:
+
+    export DATABASE_URL=sqlite:///bench.db
+    python benchmark.py generate --users 2000 --listings 20000
+    python benchmark.py run --save baseline.json
+    python benchmark.py run --compare baseline.json
+    python benchmark.py run --accept-encoding gzip --compare baseline.json
+    python benchmark.py indexes
+    python benchmark.py startup --workers 4
+    python benchmark.py similar --listings 100000
+    python benchmark.py ratelimit
+    python benchmark.py export --kind feedback --format jsonl
+
+Authorship, reviews and interests follow a Zipf-like distribution, so a few
+power users own many listings and a few hot listings collect most feedback.
+Generated listings are geocoded, tag-indexed and in the duplicate index like
+ones created through the site, so the nearby and tag scenarios have data.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from flask import g
+from sqlalchemy import insert, select
+
+from app import (
+    create_app, db, User, Listing, Feedback, Interest, Notification, SchemaMigration, MemoryRateLimiter, RedisRateLimiter,
+    SimilarityRefresh, Tag, build_duplicate_index, compute_similar_listings, create_admin_accounts, geocode,
+    geohash_encode, index_listing_tags, listing_tag, migrate, preload, process_memory, queue_similarity_refresh,
+    rebuild_similar_listings, reconcile_rating_totals, reconcile_unread_counts, rebuild_dashboard_stats,
+    refresh_similar_listings, similar_listings, similarity_terms, warm_pool
+)
+
+CATEGORIES = ['Skills & Services', 'Items & Resources']
+TYPES = ['Offering', 'Requesting']
+RATING_WEIGHTS = [5, 7, 15, 33, 40]  # 1..5 stars, skewed towards good reviews
+LOCATIONS = ['Manila', 'Quezon City', 'Makati', 'Pasig', 'Taguig', 'Cebu City', 'Davao City', 'Baguio']
+WORDS = (
+    'bike repair tutoring math guitar lessons books ladder drill sewing cooking baking garden tools '
+    'laptop fixing english science piano babysitting moving help painting plumbing carpentry '
+    'clothes shoes toys furniture chairs table lamp camera phone charger rice cooker fan'
+).split()
+BATCH_SIZE = 1000
+
+
+# =====================================================
+# DATA GENERATOR
+# =====================================================
+
+def zipf_weights(n, skew=1.1):
+    """Weights for picking among n items where the first few are picked far more often."""
+    return [1 / (rank ** skew) for rank in range(1, n + 1)]
+
+
+def random_text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def insert_batches(model, rows):
+    """Bulk insert rows (dicts) with executemany, one batch at a time."""
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(insert(model), rows[start:start + BATCH_SIZE])
+    db.session.commit()
+
+
+def generate(users, listings, feedbacks, interests, notifications, days, seed):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    random_time = lambda: now - timedelta(seconds=rng.randint(0, days * 86400))
+
+    migrate()
+    create_admin_accounts()
+    first = (db.session.query(db.func.max(User.id)).scalar() or 0) + 1
+
+    print(f"Generating {users} users...")
+    insert_batches(User, [
+        {
+            'username': f'bench{first + i}', 'email': f'bench{first + i}@example.com', 'password': 'pw',
+            'location': rng.choice(LOCATIONS), 'created_at': random_time(),
+            'rating_sum': 0, 'rating_count': 0, 'unread_notifications': 0
+        }
+        for i in range(users)
+    ])
+    user_ids = [row[0] for row in db.session.query(User.id).filter(User.id >= first).order_by(User.id)]
+
+    print(f"Generating {listings} listings...")
+    authors = rng.choices(user_ids, weights=zipf_weights(len(user_ids)), k=listings)
+    first_listing = (db.session.query(db.func.max(Listing.id)).scalar() or 0) + 1
+    points = {location: geocode(location) for location in LOCATIONS}
+    listing_rows = []
+    for author in authors:
+        created = random_time()
+        location = rng.choice(LOCATIONS)
+        latitude, longitude = points[location]
+        listing_rows.append({
+            'title': random_text(rng, rng.randint(2, 5)).capitalize(),
+            'category': rng.choice(CATEGORIES),
+            'description': random_text(rng, rng.randint(10, 60)),
+            'listing_type': rng.choice(TYPES),
+            'location': location,
+            'latitude': latitude, 'longitude': longitude, 'geohash': geohash_encode(latitude, longitude),
+            'tags': ','.join(rng.sample(WORDS, 3)),
+            'created_at': created, 'updated_at': created,
+            'rating_sum': 0, 'rating_count': 0, 'user_id': author
+        })
+    insert_batches(Listing, listing_rows)
+    listing_owners = dict(
+        db.session.query(Listing.id, Listing.user_id).filter(Listing.id >= first_listing)
+    )
+
+    print("Indexing tags...")
+    tagged = db.session.query(Listing.id, Listing.tags).filter(Listing.id >= first_listing).order_by(Listing.id).all()
+    for start in range(0, len(tagged), BATCH_SIZE):
+        index_listing_tags(tagged[start:start + BATCH_SIZE], replace=False)
+        db.session.commit()
+    listing_ids = sorted(listing_owners)
+    # Hot listings are spread over the catalogue, not just the oldest ids
+    hot_order = listing_ids[:]
+    rng.shuffle(hot_order)
+    listing_weights = zipf_weights(len(hot_order), skew=0.9)
+
+    def pairs(count):
+        """Unique (user, listing) pairs where the user does not own the listing."""
+        seen = set()
+        attempts = 0
+        while len(seen) < count and attempts < count * 20:
+            attempts += 1
+            for listing_id in rng.choices(hot_order, weights=listing_weights, k=min(BATCH_SIZE, count)):
+                user_id = rng.choice(user_ids)
+                if user_id != listing_owners[listing_id]:
+                    seen.add((user_id, listing_id))
+                if len(seen) >= count:
+                    break
+        return list(seen)
+
+    print(f"Generating {feedbacks} feedbacks...")
+    feedback_pairs = pairs(feedbacks)
+    insert_batches(Feedback, [
+        {
+            'rating': rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0],
+            'comment': random_text(rng, rng.randint(3, 20)) if rng.random() < 0.6 else None,
+            'created_at': random_time(), 'reviewer_id': user_id, 'listing_id': listing_id
+        }
+        for user_id, listing_id in feedback_pairs
+    ])
+
+    print(f"Generating {interests} interests...")
+    interest_pairs = pairs(interests)
+    insert_batches(Interest, [
+        {
+            'message': random_text(rng, rng.randint(3, 15)) if rng.random() < 0.5 else None,
+            'created_at': random_time(), 'user_id': user_id, 'listing_id': listing_id
+        }
+        for user_id, listing_id in interest_pairs
+    ])
+
+    print(f"Generating {notifications} notifications...")
+    sources = [('feedback', pair) for pair in feedback_pairs] + [('interest', pair) for pair in interest_pairs]
+    notification_rows = []
+    for _ in range(notifications):
+        notification_type, (sender_id, listing_id) = rng.choice(sources)
+        notification_rows.append({
+            'message': f'Someone left a {notification_type} on your listing',
+            'notification_type': notification_type,
+            'is_read': rng.random() < 0.7,
+            'created_at': random_time(),
+            'recipient_id': listing_owners[listing_id], 'sender_id': sender_id, 'listing_id': listing_id
+        })
+    insert_batches(Notification, notification_rows)
+
+    print("Rebuilding counters and the duplicate index...")
+    reconcile_rating_totals()
+    reconcile_unread_counts()
+    rebuild_dashboard_stats()
+    build_duplicate_index()
+
+
+# =====================================================
+# BENCHMARK RUNNER
+# =====================================================
+
+# SQL statement count of the most recent request
+last_sql_count = []
+
+
+def remember_sql_count(response):
+    last_sql_count[:] = [g.get('sql_count', 0)]
+    return response
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def build_scenarios():
+    """(name, client role, path) for every benchmarked route, using the busiest rows."""
+    power_user = db.session.query(Listing.user_id).group_by(Listing.user_id).order_by(
+        db.func.count(Listing.id).desc()
+    ).first()
+    hot_listing = db.session.query(Feedback.listing_id).group_by(Feedback.listing_id).order_by(
+        db.func.count(Feedback.id).desc()
+    ).first()
+    notified_user = db.session.query(Notification.recipient_id).group_by(Notification.recipient_id).order_by(
+        db.func.count(Notification.id).desc()
+    ).first()
+    top_tag = db.session.query(Tag.name).join(listing_tag, listing_tag.c.tag_id == Tag.id).group_by(
+        Tag.id, Tag.name
+    ).order_by(db.func.count().desc()).first()
+    if not (power_user and hot_listing and notified_user and top_tag):
+        sys.exit("The database is empty; run 'python benchmark.py generate' first.")
+    random_listing = db.session.query(Listing.id).order_by(Listing.id.desc()).first()
+    word = WORDS[0]
+    tag = top_tag[0].replace(' ', '+')
+    near = LOCATIONS[2]  # Makati: most of Metro Manila is within 25 km
+
+    return [
+        ('home', 'anonymous', '/'),
+        ('listings', 'anonymous', '/listings'),
+        ('listings (category)', 'anonymous', '/listings?category=Skills+%26+Services'),
+        ('listings (category+type)', 'anonymous', '/listings?category=Items+%26+Resources&type=Requesting'),
+        ('listings (search)', 'anonymous', f'/listings?search={word}'),
+        ('listings (search prefix)', 'anonymous', f'/listings?search={word[:3]}'),
+        ('listings (nearby 10 km)', 'anonymous', f'/listings?near={near}&radius=10'),
+        ('listings (nearby 25 km)', 'anonymous', f'/listings?near={near}&radius=25'),
+        ('listings (tag)', 'anonymous', f'/listings?tag={tag}'),
+        ('listings (tag+category)', 'anonymous', f'/listings?tag={tag}&category=Skills+%26+Services'),
+        ('listings (tag+nearby)', 'anonymous', f'/listings?tag={tag}&near={near}&radius=10'),
+        ('listing_detail (hot)', 'anonymous', f'/listing/{hot_listing[0]}'),
+        ('listing_detail (latest)', 'anonymous', f'/listing/{random_listing[0]}'),
+        ('user_profile (power user)', 'anonymous', f'/profile/{power_user[0]}'),
+        ('notifications', 'notified', '/notifications'),
+        ('admin_dashboard', 'admin', '/admin'),
+    ], notified_user[0]
+
+
+def login(app, username, password):
+    client = app.test_client()
+    client.post('/login', data={'username': username, 'password': password})
+    return client
+
+
+def run(app, iterations, warmup, save, compare, accept_encoding):
+    with app.app_context():
+        scenarios, notified_user_id = build_scenarios()
+        notified = db.session.get(User, notified_user_id)
+        dialect = db.engine.dialect.name
+        row_counts = {
+            model.__tablename__: db.session.query(db.func.count()).select_from(model).scalar()
+            for model in (User, Listing, Feedback, Interest, Notification)
+        }
+
+    clients = {
+        'anonymous': app.test_client(),
+        'notified': login(app, notified.username, notified.password),
+        'admin': login(app, 'admin', 'admin'),
+    }
+
+    headers = {'Accept-Encoding': accept_encoding}
+    print(f"Benchmarking on {dialect} with {row_counts} ({iterations} requests per route, Accept-Encoding: {accept_encoding})")
+    print(f"{'route':<28} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'queries':>8} {'bytes':>8}")
+    results = {}
+    for name, role, path in scenarios:
+        client = clients[role]
+        for _ in range(warmup):
+            client.get(path, headers=headers)
+
+        timings = []
+        queries = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            request_started = time.perf_counter()
+            response = client.get(path, headers=headers)
+            timings.append((time.perf_counter() - request_started) * 1000)
+            queries.append(last_sql_count[0] if last_sql_count else 0)
+            if response.status_code != 200:
+                sys.exit(f"{name}: {path} returned HTTP {response.status_code}")
+        elapsed = time.perf_counter() - started
+
+        timings.sort()
+        results[name] = {
+            'path': path,
+            'p50_ms': round(percentile(timings, 0.50), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'p99_ms': round(percentile(timings, 0.99), 2),
+            'throughput_rps': round(iterations / elapsed, 1),
+            'queries': round(sum(queries) / len(queries), 1),
+            'bytes': len(response.data),
+        }
+        r = results[name]
+        print(f"{name:<28} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['throughput_rps']:>8} {r['queries']:>8} {r['bytes']:>8}")
+
+    report = {
+        'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'database': dialect,
+        'rows': row_counts,
+        'iterations': iterations,
+        'accept_encoding': accept_encoding,
+        'routes': results,
+    }
+
+    if compare:
+        with open(compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {compare} ({baseline['created_at']}, {baseline['database']}):")
+        print(f"{'route':<28} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>9} {'bytes':>9}")
+        for name, r in results.items():
+            before = baseline['routes'].get(name)
+            if not before:
+                continue
+            change = lambda key: f"{(r[key] - before[key]) / before[key] * 100:+.0f}%" if before.get(key) else 'n/a'
+            print(f"{name:<28} {change('p50_ms'):>9} {change('p95_ms'):>9} {change('p99_ms'):>9} {change('queries'):>9} {change('bytes'):>9}")
+
+    if save:
+        with open(save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Results saved to {save}")
+
+
+# =====================================================
+# INDEX BENCHMARK
+# =====================================================
+
+# Indexes added by migration 0008 (hot_path_indexes)
+HOT_PATH_INDEXES = [
+    (Feedback, 'uq_feedback_listing_id_reviewer_id'),
+    (Interest, 'uq_interest_listing_id_user_id'),
+    (Notification, 'ix_notification_recipient_id_is_read'),
+    (Notification, 'ix_notification_recipient_id_created_at_id'),
+    (Listing, 'ix_listing_created_at_id'),
+    (Listing, 'ix_listing_user_id_created_at_id'),
+]
+
+
+def hot_path_queries():
+    """(name, statement) for the queries the 0008 indexes are meant to serve, using the busiest rows."""
+    scenarios, notified_user_id = build_scenarios()
+    power_user_id = int(scenarios[8][2].rsplit('/', 1)[1])
+    feedback = db.session.query(Feedback.listing_id, Feedback.reviewer_id).order_by(Feedback.id.desc()).first()
+    interest = db.session.query(Interest.listing_id, Interest.user_id).order_by(Interest.id.desc()).first()
+
+    return [
+        ('unread notifications', select(db.func.count(Notification.id)).where(
+            Notification.recipient_id == notified_user_id, Notification.is_read.is_(False))),
+        ('notifications page', select(Notification.id).where(Notification.recipient_id == notified_user_id)
+            .order_by(Notification.created_at.desc(), Notification.id.desc()).limit(20)),
+        ('listings page', select(Listing.id).order_by(Listing.created_at.desc(), Listing.id.desc()).limit(20)),
+        ('my listings page', select(Listing.id).where(Listing.user_id == power_user_id)
+            .order_by(Listing.created_at.desc(), Listing.id.desc()).limit(20)),
+        ('feedback lookup', select(Feedback.id).where(
+            Feedback.listing_id == feedback.listing_id, Feedback.reviewer_id == feedback.reviewer_id)),
+        ('interest lookup', select(Interest.id).where(
+            Interest.listing_id == interest.listing_id, Interest.user_id == interest.user_id)),
+    ]
+
+
+def time_queries(queries, iterations):
+    """Median milliseconds per query."""
+    medians = {}
+    for name, statement in queries:
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            db.session.execute(statement).all()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        medians[name] = percentile(timings, 0.50)
+    return medians
+
+
+def benchmark_indexes(app, iterations):
+    """Time the hot queries without the 0008 indexes, apply the migration, then time them again."""
+    with app.app_context():
+        migrate()
+        queries = hot_path_queries()
+
+        for model, name in HOT_PATH_INDEXES:
+            index = next(index for index in model.__table__.indexes if index.name == name)
+            index.drop(db.session.connection(), checkfirst=True)
+        db.session.query(SchemaMigration).filter_by(version='0008').delete()
+        db.session.commit()
+        before = time_queries(queries, iterations)
+
+        applied = migrate()
+        after = time_queries(queries, iterations)
+        dialect = db.engine.dialect.name
+
+    print(f"Benchmarking on {dialect} ({iterations} runs per query, median ms)")
+    for version, name, duration_ms in applied:
+        print(f"Migration {version} {name} took {duration_ms} ms")
+    print(f"{'query':<24} {'before':>9} {'after':>9} {'change':>8}")
+    for name, _ in queries:
+        change = f"{(after[name] - before[name]) / before[name] * 100:+.0f}%" if before[name] else 'n/a'
+        print(f"{name:<24} {before[name]:>9.3f} {after[name]:>9.3f} {change:>8}")
+
+
+# =====================================================
+# SIMILAR LISTINGS
+# =====================================================
+
+
+def synthetic_documents(count, vocabulary, seed):
+    """[(id, {term: count})] with Zipf-distributed words, like real listing text (WORDS is too small for this)."""
+    rng = random.Random(seed)
+    words = [f'word{n}' for n in range(vocabulary)]
+    cumulative, total = [], 0
+    for weight in zipf_weights(vocabulary):
+        total += weight
+        cumulative.append(total)
+    return [
+        (listing_id, similarity_terms(
+            ' '.join(rng.choices(words, cum_weights=cumulative, k=4)),
+            ' '.join(rng.choices(words, cum_weights=cumulative, k=rng.randint(10, 60))),
+            CATEGORIES[listing_id % 2],
+            ','.join(rng.choices(words, cum_weights=cumulative, k=2))
+        ))
+        for listing_id in range(1, count + 1)
+    ]
+
+
+def benchmark_similar(app, listings, vocabulary, iterations, seed):
+    """Time the batch neighbour computation on a synthetic corpus, then the rebuild and refreshes on DATABASE_URL."""
+    k = app.config['SIMILAR_LISTINGS_K']
+    max_term_listings = app.config['SIMILAR_LISTINGS_MAX_TERM_LISTINGS']
+    documents = synthetic_documents(listings, vocabulary, seed)
+    started = time.perf_counter()
+    vectors, neighbours = compute_similar_listings(documents, k, max_term_listings)
+    elapsed = time.perf_counter() - started
+    terms = sum(len(vector) for vector in vectors)
+    print(f"Batch TF-IDF + top-{k} neighbours: {listings} synthetic listings, {terms} terms, "
+          f"{elapsed:.1f}s ({elapsed / listings * 1000:.3f} ms per listing)")
+
+    with app.app_context():
+        migrate()
+        listing_ids = [listing_id for (listing_id,) in db.session.query(Listing.id).filter(Listing.deleted_at.is_(None))]
+        if not listing_ids:
+            print("No listings in the database; run 'python benchmark.py generate' to time rebuilds and refreshes.")
+            return
+        started = time.perf_counter()
+        rebuild_similar_listings()
+        print(f"Rebuild on {db.engine.dialect.name}: {len(listing_ids)} listings in {time.perf_counter() - started:.1f}s")
+
+        rng = random.Random(seed)
+        refreshes, lookups = [], []
+        for listing_id in rng.sample(listing_ids, min(iterations, len(listing_ids))):
+            queue_similarity_refresh([listing_id])
+            db.session.commit()
+            started = time.perf_counter()
+            refresh_similar_listings()
+            refreshes.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            similar_listings(listing_id)
+            lookups.append((time.perf_counter() - started) * 1000)
+        db.session.query(SimilarityRefresh).delete()
+        db.session.commit()
+
+    refreshes.sort()
+    lookups.sort()
+    print(f"Incremental refresh of one listing: p50 {percentile(refreshes, 0.5):.1f} ms, p95 {percentile(refreshes, 0.95):.1f} ms")
+    print(f"Listing page lookup: p50 {percentile(lookups, 0.5):.2f} ms, p95 {percentile(lookups, 0.95):.2f} ms")
+
+
+# =====================================================
+# RATE LIMITING
+# =====================================================
+
+
+def time_requests(client, iterations, **kwargs):
+    """Sorted milliseconds per request."""
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        client.open(**kwargs)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings
+
+
+def benchmark_rate_limit(app, iterations, redis_url):
+    """Time one token bucket check per backend, then a rate limited POST with the limiter on and off."""
+    backends = [('memory', MemoryRateLimiter(app.config['RATE_LIMIT_MAX_KEYS']))]
+    if redis_url:
+        backends.append(('redis', RedisRateLimiter(redis_url)))
+    for name, limiter in backends:
+        started = time.perf_counter()
+        for i in range(iterations):
+            # Many clients, as in production, so the buckets dict is not a single hot entry
+            limiter.take(f'benchmark:ip:10.0.{i % 250}.{i % 199}', iterations, iterations)
+        elapsed = time.perf_counter() - started
+        print(f"{name} backend: {elapsed / iterations * 1e6:.1f} µs per bucket check")
+
+    # Limits high enough that nothing is refused: this measures the overhead only
+    with app.app_context():
+        migrate()
+    login_view = app.view_functions['main.login']
+    methods, scopes = login_view.rate_limits
+    login_view.rate_limits = (methods, {scope: (iterations * 10, 1) for scope in scopes})
+    app.extensions.pop('rate_limiter', None)
+    request_args = {'path': '/login', 'method': 'POST', 'data': {'username': 'nobody', 'password': 'wrong'}}
+    client = app.test_client()
+    results = {}
+    # Each setting runs twice and the second run counts, so both are measured warm
+    for enabled in (False, True, False, True):
+        app.config['RATE_LIMIT_ENABLED'] = enabled
+        results[enabled] = time_requests(client, iterations // 10, **request_args)
+    off, on = percentile(results[False], 0.5), percentile(results[True], 0.5)
+    print(f"POST /login p50: {off:.3f} ms without the limiter, {on:.3f} ms with it ({(on - off) * 1000:+.0f} µs)")
+    login_view.rate_limits = (methods, scopes)
+
+
+# =====================================================
+# EXPORTS
+# =====================================================
+
+
+def benchmark_export(app, kind, file_format):
+    """Stream one admin export to the end; report time to first byte, throughput and memory growth."""
+    client = login(app, 'admin', 'admin')
+    resident_before, _ = process_memory()
+    peak = resident_before
+    started = time.perf_counter()
+    response = client.get(f'/admin/export/{kind}.{file_format}', buffered=False)
+    first_byte = None
+    size = lines = 0
+    for chunk in response.response:
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        size += len(chunk)
+        lines += chunk.count(b'\n')
+        peak = max(peak, process_memory()[0])
+    elapsed = time.perf_counter() - started
+    response.close()
+
+    rows = lines - 1 if file_format == 'csv' else lines  # multi-line text fields make this approximate in CSV
+    print(f"GET /admin/export/{kind}.{file_format}: first byte after {(first_byte or elapsed) * 1000:.1f} ms")
+    print(f"~{rows} rows, {size / 2**20:.1f} MB in {elapsed:.2f}s ({size / 2**20 / elapsed:.1f} MB/s)")
+    print(f"Resident memory: {format_mb(resident_before)} MB before, {format_mb(peak)} MB at peak")
+
+
+# =====================================================
+# WORKER STARTUP
+# =====================================================
+
+
+def format_mb(value):
+    return f"{value:.1f}" if value is not None else 'n/a'
+
+
+def start_worker(app):
+    """In a forked child: what gunicorn's post_worker_init does, then one request. Returns timings and memory."""
+    started = time.perf_counter()
+    warm_pool(app)
+    ready = time.perf_counter()
+    app.test_client().get('/login')
+    first_request = time.perf_counter()
+    resident, private = process_memory()
+    return {
+        'ready_ms': (ready - started) * 1000,
+        'first_request_ms': (first_request - ready) * 1000,
+        'resident_mb': resident,
+        'private_mb': private,
+    }
+
+
+def benchmark_startup(app, workers):
+    """Time a cold import and the master's preload, then fork workers the way gunicorn does."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'from app import create_app; create_app()'], check=True)
+    cold_import = time.perf_counter() - started
+    preload_seconds = preload(app)
+    resident, private = process_memory()
+
+    print(f"Cold import of app.py and create_app(): {cold_import * 1000:.0f} ms (includes interpreter startup)")
+    print(f"Master preload: {preload_seconds * 1000:.0f} ms, {format_mb(resident)} MB resident")
+    print(f"{'worker':<8} {'ready ms':>9} {'1st req ms':>11} {'RSS MB':>8} {'private MB':>11}")
+
+    for worker in range(workers):
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_end)
+            with os.fdopen(write_end, 'w') as pipe:
+                json.dump(start_worker(app), pipe)
+            os._exit(0)
+
+        os.close(write_end)
+        with os.fdopen(read_end) as pipe:
+            result = json.load(pipe)
+        os.waitpid(pid, 0)
+        print(
+            f"{worker:<8} {result['ready_ms']:>9.1f} {result['first_request_ms']:>11.1f} "
+            f"{format_mb(result['resident_mb']):>8} {format_mb(result['private_mb']):>11}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate_parser = commands.add_parser('generate', help='bulk insert synthetic rows')
+    generate_parser.add_argument('--users', type=int, default=1000)
+    generate_parser.add_argument('--listings', type=int, default=10000)
+    generate_parser.add_argument('--feedbacks', type=int, default=30000)
+    generate_parser.add_argument('--interests', type=int, default=20000)
+    generate_parser.add_argument('--notifications', type=int, default=50000)
+    generate_parser.add_argument('--days', type=int, default=365, help='spread created_at over this many days')
+    generate_parser.add_argument('--seed', type=int, default=42)
+
+    run_parser = commands.add_parser('run', help='time the routes through the Flask test client')
+    run_parser.add_argument('--iterations', type=int, default=100)
+    run_parser.add_argument('--warmup', type=int, default=5)
+    run_parser.add_argument('--save', help='write the results to this JSON file')
+    run_parser.add_argument('--compare', help='compare with a JSON file saved by an earlier run')
+    run_parser.add_argument('--accept-encoding', default='identity', help="e.g. 'gzip' or 'br' to measure compressed sizes")
+
+    indexes_parser = commands.add_parser('indexes', help='time the hot queries before and after migration 0008')
+    indexes_parser.add_argument('--iterations', type=int, default=200)
+
+    startup_parser = commands.add_parser('startup', help='time preloading the app and forking workers from it')
+    startup_parser.add_argument('--workers', type=int, default=4)
+
+    similar_parser = commands.add_parser('similar', help='time the similar listings batch build and refreshes')
+    similar_parser.add_argument('--listings', type=int, default=100000, help='size of the synthetic corpus')
+    similar_parser.add_argument('--vocabulary', type=int, default=20000)
+    similar_parser.add_argument('--iterations', type=int, default=50, help='incremental refreshes to time')
+    similar_parser.add_argument('--seed', type=int, default=42)
+
+    ratelimit_parser = commands.add_parser('ratelimit', help='time the rate limiter per request')
+    ratelimit_parser.add_argument('--iterations', type=int, default=20000)
+    ratelimit_parser.add_argument('--redis-url', help='also time the shared Redis backend')
+
+    export_parser = commands.add_parser('export', help='time streaming an admin export')
+    export_parser.add_argument('--kind', choices=['listings', 'feedback', 'interests'], default='listings')
+    export_parser.add_argument('--format', dest='file_format', choices=['csv', 'jsonl'], default='csv')
+
+    args = parser.parse_args()
+    if 'DATABASE_URL' not in os.environ:
+        sys.exit("Set DATABASE_URL to a scratch database first (e.g. sqlite:///bench.db).")
+    app = create_app()
+    app.after_request(remember_sql_count)
+
+    if args.command == 'generate':
+        with app.app_context():
+            started = time.perf_counter()
+            generate(args.users, args.listings, args.feedbacks, args.interests, args.notifications, args.days, args.seed)
+            print(f"✅ Generated data in {time.perf_counter() - started:.1f}s")
+    elif args.command == 'export':
+        benchmark_export(app, args.kind, args.file_format)
+    elif args.command == 'indexes':
+        benchmark_indexes(app, args.iterations)
+    elif args.command == 'ratelimit':
+        benchmark_rate_limit(app, args.iterations, args.redis_url)
+    elif args.command == 'similar':
+        benchmark_similar(app, args.listings, args.vocabulary, args.iterations, args.seed)
+    elif args.command == 'startup':
+        benchmark_startup(app, args.workers)
+    else:
+        run(app, args.iterations, args.warmup, args.save, args.compare, args.accept_encoding)
+
+
+if __name__ == '__main__':
+    main()
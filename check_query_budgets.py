@@ -0,0 +1,205 @@
+"""
+Query budget check for The Helping Hand.
+
+Drives every route through the Flask test client against a throwaway SQLite
+database and fails if a request runs more SQL statements than its route's
+@query_budget allows (see QUERY BUDGETS in app.py). The seeded data fills
+whole pages, so a lazy relationship load per row (N+1) blows the budget.
+
+Usage:
+    python check_query_budgets.py
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+from flask import g, request
+
+from app import (
+    create_app, db, User, Listing, Feedback, Interest, Notification, QueryBudgetExceeded,
+    build_duplicate_index, create_admin_accounts, index_listing_tags, locate_listing, migrate,
+    reconcile_rating_totals, reconcile_unread_counts, rebuild_dashboard_stats
+)
+
+USERS = 6
+LISTINGS_PER_USER = 25
+CATEGORIES = ['Skills & Services', 'Items & Resources']
+TYPES = ['Offering', 'Requesting']
+
+# (endpoint, number of SQL statements) for every request made
+statement_counts = []
+
+
+def remember_statement_count(response):
+    # Registered after app.py's budget check, so Flask runs it (and its close callback) first
+    if 'sql_statements' in g:
+        endpoint, statements = request.endpoint, g.sql_statements
+        # Counted once the response is closed: streamed bodies (the exports) query while they are read
+        response.call_on_close(lambda: statement_counts.append((endpoint, len(statements))))
+    return response
+
+
+def seed():
+    """Create enough rows that every list view renders full pages."""
+    db.drop_all()
+    migrate()
+    create_admin_accounts()
+
+    start = datetime.utcnow() - timedelta(days=30)
+    users = [
+        User(username=f'user{i}', email=f'user{i}@example.com', password='pw', location='Manila', created_at=start)
+        for i in range(USERS)
+    ]
+    db.session.add_all(users)
+    db.session.flush()
+
+    for i, user in enumerate(users):
+        for n in range(LISTINGS_PER_USER):
+            listing = Listing(
+                title=f'Listing {n} by {user.username}',
+                category=CATEGORIES[n % 2],
+                description='Bike repair, tutoring and other help around the neighbourhood.',
+                listing_type=TYPES[(n // 2) % 2],
+                location='Manila',
+                tags='bike,repair',
+                user_id=user.id,
+                created_at=start + timedelta(hours=i * LISTINGS_PER_USER + n)
+            )
+            locate_listing(listing)
+            db.session.add(listing)
+            db.session.flush()
+
+            # The first two listings of each user stay without feedback so they can be edited
+            others = [other for other in users if other.id != user.id][:2]
+            for other in others:
+                if n >= 2:
+                    db.session.add(Feedback(rating=4, comment='Great!', reviewer_id=other.id, listing_id=listing.id))
+                db.session.add(Interest(user_id=other.id, listing_id=listing.id, message='Hi!'))
+                db.session.add(Notification(
+                    recipient_id=user.id, sender_id=other.id, listing_id=listing.id,
+                    notification_type='interest', message=f'{other.username} is interested'
+                ))
+
+    index_listing_tags(db.session.query(Listing.id, Listing.tags).all(), replace=False)
+    db.session.commit()
+    reconcile_rating_totals()
+    reconcile_unread_counts()
+    rebuild_dashboard_stats()
+    # The listings share a description, so most of them get flagged as near-duplicates
+    build_duplicate_index()
+
+
+def login(app, username, password='pw'):
+    client = app.test_client()
+    client.post('/login', data={'username': username, 'password': password})
+    return client
+
+
+def main():
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': os.environ.get('QUERY_BUDGET_DATABASE_URL', 'sqlite://'),
+        'SQLALCHEMY_BINDS': {},
+        'TESTING': True,
+        'ENFORCE_QUERY_BUDGETS': True,
+        # Keep the notification stream short: one catch-up event, a heartbeat or two, then it ends
+        'SSE_MAX_SECONDS': 1,
+        'SSE_HEARTBEAT_SECONDS': 0.25,
+    })
+    app.after_request(remember_statement_count)
+
+    with app.app_context():
+        seed()
+        owner = User.query.filter_by(username='user0').first()
+        other = User.query.filter_by(username='user1').first()
+        outsider = User.query.filter_by(username='user5').first()
+        owner_listing = Listing.query.filter_by(user_id=owner.id).order_by(Listing.id.desc()).first()
+        editable_listing = Listing.query.filter_by(user_id=owner.id).order_by(Listing.id).first()
+        feedback = Feedback.query.filter_by(reviewer_id=other.id).first()
+        notifications = Notification.query.filter_by(recipient_id=owner.id).order_by(Notification.id).limit(2).all()
+        owner_id, other_id, outsider_id = owner.id, other.id, outsider.id
+        listing_id, editable_id, feedback_id = owner_listing.id, editable_listing.id, feedback.id
+        notification_ids = [n.id for n in notifications]
+        start_day = Listing.query.order_by(Listing.id).first().created_at.strftime('%Y-%m-%d')
+        duplicate_id = Listing.query.filter(Listing.duplicate_of_id.isnot(None)).order_by(Listing.id).first().id
+
+    anonymous = app.test_client()
+    owner_client = login(app, 'user0')
+    other_client = login(app, 'user1')
+    outsider_client = login(app, 'user5')
+    admin_client = login(app, 'admin', 'admin')
+    listing_form = {
+        'title': 'Ladder to lend', 'category': 'Items & Resources',
+        'description': 'A tall ladder', 'listing_type': 'Offering', 'tags': 'tools'
+    }
+
+    # Read-only views first, then the routes that change data
+    checks = [
+        ('GET /', anonymous, 'GET', '/', None),
+        ('GET / (logged in)', owner_client, 'GET', '/', None),
+        ('GET /listings', anonymous, 'GET', '/listings', None),
+        ('GET /listings (filtered)', other_client, 'GET', '/listings?category=Skills+%26+Services&type=Offering', None),
+        ('GET /listings (search)', other_client, 'GET', '/listings?search=bike+rep', None),
+        ('GET /listings (nearby)', other_client, 'GET', '/listings?near=Makati&radius=10', None),
+        ('GET /listings (tagged)', other_client, 'GET', '/listings?tag=bike&category=Skills+%26+Services', None),
+        ('GET /listing/<id>', anonymous, 'GET', f'/listing/{listing_id}', None),
+        ('GET /listing/<id> (owner)', owner_client, 'GET', f'/listing/{listing_id}', None),
+        ('GET /listing/<id> (reviewer)', other_client, 'GET', f'/listing/{listing_id}', None),
+        ('GET /my_listings', owner_client, 'GET', '/my_listings', None),
+        ('GET /profile/<id>', anonymous, 'GET', f'/profile/{owner_id}', None),
+        ('GET /notifications', owner_client, 'GET', '/notifications', None),
+        ('GET /notifications/stream', owner_client, 'GET', '/notifications/stream', None),
+        ('GET /listing/<id>/interests', owner_client, 'GET', f'/listing/{listing_id}/interests', None),
+        ('GET /admin', admin_client, 'GET', '/admin', None),
+        ('GET /admin/duplicates', admin_client, 'GET', '/admin/duplicates', None),
+        ('GET /admin/export/listings.csv', admin_client, 'GET', '/admin/export/listings.csv', None),
+        ('GET /admin/export/feedback.jsonl', admin_client, 'GET',
+         f'/admin/export/feedback.jsonl?from={start_day}&category=Skills+%26+Services', None),
+        ('GET /admin/export/interests.csv', admin_client, 'GET', f'/admin/export/interests.csv?to={start_day}', None),
+        ('GET /create_listing', owner_client, 'GET', '/create_listing', None),
+        ('GET /edit_listing/<id>', owner_client, 'GET', f'/edit_listing/{editable_id}', None),
+        ('GET /login', anonymous, 'GET', '/login', None),
+        ('GET /register', anonymous, 'GET', '/register', None),
+        ('POST /register', anonymous, 'POST', '/register',
+         {'username': 'newcomer', 'email': 'newcomer@example.com', 'password': 'pw'}),
+        ('POST /login', anonymous, 'POST', '/login', {'username': 'newcomer', 'password': 'pw'}),
+        ('POST /create_listing', owner_client, 'POST', '/create_listing', listing_form),
+        ('POST /edit_listing/<id>', owner_client, 'POST', f'/edit_listing/{editable_id}', listing_form),
+        ('POST /listing/<id>/interest', outsider_client, 'POST', f'/listing/{listing_id}/interest', {'message': 'Hello'}),
+        ('POST /listing/<id>/feedback', outsider_client, 'POST', f'/listing/{listing_id}/feedback', {'rating': '5'}),
+        ('GET /feedback/<id>/delete', other_client, 'GET', f'/feedback/{feedback_id}/delete', None),
+        ('GET /notifications/read/<id>', owner_client, 'GET', f'/notifications/read/{notification_ids[0]}', None),
+        ('GET /notifications/delete/<id>', owner_client, 'GET', f'/notifications/delete/{notification_ids[1]}', None),
+        ('GET /notifications/read_all', owner_client, 'GET', '/notifications/read_all', None),
+        ('GET /notifications/clear_all', owner_client, 'GET', '/notifications/clear_all', None),
+        ('GET /admin/duplicates/<id>/dismiss', admin_client, 'GET', f'/admin/duplicates/{duplicate_id}/dismiss', None),
+        ('GET /delete_listing/<id>', owner_client, 'GET', f'/delete_listing/{listing_id}', None),
+        ('GET /admin/delete_user/<id>', admin_client, 'GET', f'/admin/delete_user/{outsider_id}', None),
+        ('GET /logout', owner_client, 'GET', '/logout', None),
+    ]
+
+    failures = 0
+    for label, client, method, path, data in checks:
+        try:
+            response = client.open(path, method=method, data=data)
+            response.get_data()  # streamed responses (exports, SSE) run to the end before the next request
+            response.close()
+            endpoint, count = statement_counts[-1]
+            budget = getattr(app.view_functions.get(endpoint), 'query_budget', None)
+            status = 'ok'
+            if response.status_code >= 400 or budget is None:
+                status = f'HTTP {response.status_code}' if response.status_code >= 400 else 'NO BUDGET'
+                failures += 1
+            print(f"  {status:<9} {label:<36} {count:>3} / {budget} queries")
+        except QueryBudgetExceeded as error:
+            failures += 1
+            print(f"  OVER      {label:<36} {error}")
+
+    if failures:
+        print(f"❌ {failures} route(s) failed the query budget check")
+        return 1
+    print("✅ All routes are within their query budgets")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+gunicorn settings for The Helping Hand:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Workers are forked from a master that has already imported the app (see wsgi.py).
+app.py drops the inherited connection pools in each child; post_worker_init then
+opens DB_POOL_WARMUP connections, starts the live update listener and logs how
+long the worker took to become ready and how much memory it uses on its own.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+# Threads per worker. Each open /notifications/stream holds one for up to
+# SSE_MAX_SECONDS, so WEB_CONCURRENCY * GUNICORN_THREADS caps the notifications
+# tabs open at once plus the requests being served. Only the notifications page
+# opens a stream; raise GUNICORN_THREADS if many users keep it open.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Import the app once in the master and fork workers from it
+preload_app = True
+
+
+def when_ready(server):
+    import wsgi
+    from app import process_memory
+
+    resident, _ = process_memory()
+    server.log.info(
+        "App preloaded: import %.0f ms, templates %.0f ms, %.1f MB resident",
+        wsgi.import_seconds * 1000, wsgi.preload_seconds * 1000, resident
+    )
+
+
+def post_worker_init(worker):
+    import time
+    import app as app_module
+    import wsgi
+
+    app_module.warm_pool(wsgi.app)
+    with wsgi.app.app_context():
+        # Hears load_user cache evictions from the other workers from the start
+        app_module.start_live_update_listener()
+    resident, private = app_module.process_memory()
+    worker.log.info(
+        "Worker %s ready in %.0f ms: %.1f MB resident, %s MB private",
+        worker.pid, (time.perf_counter() - app_module.process_started) * 1000, resident,
+        f'{private:.1f}' if private is not None else 'n/a'
+    )
@@ -0,0 +1,54 @@
+import pytest
+
+from app import create_app, create_admin_accounts, db, migrate, Listing, User
+
+
+@pytest.fixture
+def app():
+    """A fresh app on an in-memory SQLite database with the full schema and the admin accounts."""
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SQLALCHEMY_BINDS': {}, 'TESTING': True})
+    with app.app_context():
+        migrate()
+        create_admin_accounts()
+    return app
+
+
+@pytest.fixture
+def app_context(app):
+    # Only for tests without requests: a request would share its g (and the logged-in user)
+    with app.app_context():
+        yield
+        db.session.remove()
+
+
+@pytest.fixture
+def make_user(app):
+    def make_user(username):
+        with app.app_context():
+            user = User(username=username, email=f'{username}@example.com', password='pw')
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+    return make_user
+
+
+@pytest.fixture
+def login(app):
+    def login(username, password='pw'):
+        client = app.test_client()
+        response = client.post('/login', data={'username': username, 'password': password})
+        assert response.status_code == 302
+        return client
+    return login
+
+
+@pytest.fixture
+def post_listing(app):
+    def post_listing(client, title, description='I fix bikes and scooters in the neighbourhood on weekends', **form):
+        client.post('/create_listing', data={
+            'title': title, 'category': 'Skills & Services', 'description': description,
+            'listing_type': 'Offering', **form
+        })
+        with app.app_context():
+            return db.session.query(Listing.id).filter_by(title=title).scalar()
+    return post_listing
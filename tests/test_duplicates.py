@@ -0,0 +1,132 @@
+import csv
+
+from flask import current_app
+
+from app import (
+    build_duplicate_index, bulk_import, db, minhash_signature, signature_similarity, Listing, ListingBand
+)
+
+BIKE = 'I fix flat tyres, brakes and gears on any bicycle for free at weekends'
+TUTORING = 'Algebra and calculus lessons for high school students, online or at the library'
+
+
+def flags(app):
+    with app.app_context():
+        return {listing.title: (listing.duplicate_of_id, listing.duplicate_score) for listing in Listing.query}
+
+
+def test_signature_estimates_jaccard_similarity(app_context):
+    same = signature_similarity(minhash_signature('Bike repair', BIKE), minhash_signature('Bike repair', BIKE))
+    close = signature_similarity(minhash_signature('Bike repair', BIKE), minhash_signature('Bike repair', BIKE + ' too'))
+    different = signature_similarity(minhash_signature('Bike repair', BIKE), minhash_signature('Tutoring', TUTORING))
+    assert same == 1.0
+    assert 0.6 < close < 1.0
+    assert different < 0.2
+    assert minhash_signature('', '') is None
+
+
+def test_copy_is_flagged_against_the_original(app, make_user, login, post_listing):
+    make_user('alice')
+    make_user('bob')
+    original = post_listing(login('alice'), 'Bike repair', description=BIKE)
+    client = login('bob')
+    client.post('/create_listing', data={
+        'title': 'Bike repair!', 'category': 'Skills & Services', 'description': BIKE, 'listing_type': 'Offering'
+    })
+    post_listing(client, 'Tutoring', description=TUTORING)
+
+    flagged = flags(app)
+    assert flagged['Bike repair'] == (None, None)
+    assert flagged['Bike repair!'][0] == original
+    assert flagged['Bike repair!'][1] >= app.config['DUPLICATE_THRESHOLD']
+    assert flagged['Tutoring'] == (None, None)
+    with app.app_context():
+        assert ListingBand.query.filter_by(listing_id=original).count() == app.config['LSH_BANDS']
+
+
+def test_block_refuses_the_copy(app, make_user, login, post_listing):
+    app.config['DUPLICATE_ACTION'] = 'block'
+    make_user('alice')
+    post_listing(login('alice'), 'Bike repair', description=BIKE)
+    response = login('alice').post('/create_listing', data={
+        'title': 'Bike repair', 'category': 'Skills & Services', 'description': BIKE, 'listing_type': 'Offering'
+    })
+
+    assert 'A very similar listing already exists' in response.get_data(as_text=True)
+    with app.app_context():
+        assert Listing.query.count() == 1
+
+
+def test_editing_away_from_the_original_clears_the_flag(app, make_user, login, post_listing):
+    make_user('alice')
+    client = login('alice')
+    post_listing(client, 'Bike repair', description=BIKE)
+    copy = post_listing(client, 'Bike Repair', description=BIKE)
+    assert flags(app)['Bike Repair'][0] is not None
+
+    client.post(f'/edit_listing/{copy}', data={
+        'title': 'Tutoring', 'category': 'Skills & Services', 'description': TUTORING, 'listing_type': 'Offering'
+    })
+    assert flags(app)['Tutoring'] == (None, None)
+
+
+def test_build_index_flags_existing_listings_except_reviewed(app_context, make_user):
+    alice = make_user('alice')
+    db.session.add_all([
+        Listing(title=title, category='Skills & Services', listing_type='Offering', description=description, user_id=alice)
+        for title, description in [('Bike repair', BIKE), ('Bike repair', BIKE), ('Bike repair', BIKE), ('Tutoring', TUTORING)]
+    ])
+    db.session.commit()
+    original, copy, reviewed, tutoring = [listing.id for listing in Listing.query.order_by(Listing.id)]
+    db.session.get(Listing, reviewed).duplicate_reviewed_at = db.func.now()
+    db.session.commit()
+
+    assert build_duplicate_index(batch_size=2) == (4, 1)
+    assert db.session.get(Listing, copy).duplicate_of_id == original
+    assert db.session.get(Listing, reviewed).duplicate_of_id is None
+    assert db.session.get(Listing, tutoring).duplicate_of_id is None
+    assert ListingBand.query.count() == 4 * current_app.config['LSH_BANDS']
+
+
+def test_bulk_import_flags_copies_in_the_batch_and_of_indexed_listings(app, make_user, tmp_path):
+    path = tmp_path / 'listings.csv'
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['title', 'category', 'description', 'listing_type', 'username'])
+        writer.writerow(['Bike repair', 'Skills & Services', BIKE, 'Offering', 'alice'])
+        writer.writerow(['Tutoring', 'Skills & Services', TUTORING, 'Offering', 'alice'])
+        writer.writerow(['Tutoring again', 'Skills & Services', TUTORING, 'Offering', 'alice'])
+    alice = make_user('alice')
+    with app.app_context():
+        existing = Listing(title='Bike repair', category='Skills & Services', listing_type='Offering',
+                           description=BIKE, user_id=alice)
+        db.session.add(existing)
+        db.session.commit()
+        build_duplicate_index()
+        existing_id = existing.id
+
+        bulk_import('listings', str(path), 'csv', batch_size=5)
+
+        imported = Listing.query.filter(Listing.id != existing_id).order_by(Listing.id).all()
+        assert [listing.duplicate_of_id for listing in imported] == [existing_id, None, imported[1].id]
+        assert all(listing.minhash is not None for listing in imported)
+        assert ListingBand.query.filter(ListingBand.listing_id.in_([listing.id for listing in imported])).count() == (
+            3 * app.config['LSH_BANDS']
+        )
+
+
+def test_admin_reviews_and_dismisses_duplicates(app, make_user, login, post_listing):
+    make_user('alice')
+    client = login('alice')
+    post_listing(client, 'Bike repair', description=BIKE)
+    copy = post_listing(client, 'Bike Repair', description=BIKE)
+
+    admin = login('admin', 'admin')
+    page = admin.get('/admin/duplicates').get_data(as_text=True)
+    assert 'Bike Repair<' in page and f'/admin/duplicates/{copy}/dismiss' in page
+
+    admin.get(f'/admin/duplicates/{copy}/dismiss')
+    assert 'Bike Repair<' not in admin.get('/admin/duplicates').get_data(as_text=True)
+    with app.app_context():
+        assert db.session.get(Listing, copy).duplicate_reviewed_at is not None
+    assert login('alice').get('/admin/duplicates').status_code == 302
@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from app import bulk_export, db, export_chunks, export_filters, Feedback, Interest, Listing, User
+
+
+@pytest.fixture
+def exported(app, make_user):
+    """Two listings by alice (one deleted), feedback and interests from bob and a deleted user."""
+    alice, bob, gone = make_user('alice'), make_user('bob'), make_user('gone')
+    with app.app_context():
+        bike, books, hidden = [
+            Listing(title=title, category=category, listing_type='Offering', description='d', user_id=alice,
+                    created_at=created_at)
+            for title, category, created_at in [
+                ('Bike repair', 'Skills & Services', datetime(2024, 1, 10)),
+                ('Spare books', 'Items & Resources', datetime(2024, 2, 10)),
+                ('Hidden', 'Skills & Services', datetime(2024, 1, 20)),
+            ]
+        ]
+        hidden.deleted_at = datetime(2024, 3, 1)
+        db.session.add_all([bike, books, hidden])
+        db.session.flush()
+        db.session.add_all([
+            Feedback(rating=5, comment='Great, "quick" fix', reviewer_id=bob, listing_id=bike.id, created_at=datetime(2024, 1, 15)),
+            Feedback(rating=4, comment='Nice books', reviewer_id=bob, listing_id=books.id, created_at=datetime(2024, 2, 15)),
+            Feedback(rating=1, comment='Hidden listing', reviewer_id=bob, listing_id=hidden.id, created_at=datetime(2024, 1, 25)),
+            Feedback(rating=1, comment='Deleted user', reviewer_id=gone, listing_id=books.id, created_at=datetime(2024, 2, 16)),
+            Interest(message='Still available?', user_id=bob, listing_id=books.id, created_at=datetime(2024, 2, 12)),
+        ])
+        db.session.get(User, gone).deleted_at = datetime(2024, 3, 1)
+        db.session.commit()
+
+
+def test_listings_csv_streams_visible_listings(app, exported, login):
+    response = login('admin', 'admin').get('/admin/export/listings.csv')
+
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'].startswith('attachment; filename="helping-hand-listings-')
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [(row['title'], row['username'], row['created_at']) for row in rows] == [
+        ('Bike repair', 'alice', '2024-01-10T00:00:00'),
+        ('Spare books', 'alice', '2024-02-10T00:00:00'),
+    ]
+
+
+def test_feedback_jsonl_is_filtered(app, exported, login):
+    admin = login('admin', 'admin')
+    response = admin.get('/admin/export/feedback.jsonl')
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['comment'] for row in rows] == ['Great, "quick" fix', 'Nice books']
+
+    response = admin.get('/admin/export/feedback.jsonl?from=2024-01-01&to=2024-01-31&category=Skills+%26+Services')
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(row['listing_title'], row['username'], row['rating']) for row in rows] == [('Bike repair', 'bob', 5)]
+
+
+def test_interests_csv(app, exported, login):
+    response = login('admin', 'admin').get('/admin/export/interests.csv?from=2024-02-12&to=2024-02-12')
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == ['id', 'listing_id', 'listing_title', 'category', 'username', 'message', 'created_at']
+    assert [row[2:6] for row in rows[1:]] == [['Spare books', 'Items & Resources', 'bob', 'Still available?']]
+
+
+def test_export_is_admin_only_and_checks_its_filters(app, exported, login):
+    assert login('alice').get('/admin/export/listings.csv').status_code == 302
+    admin = login('admin', 'admin')
+    assert admin.get('/admin/export/users.csv').status_code == 404
+    assert admin.get('/admin/export/listings.xml').status_code == 404
+
+    response = admin.get('/admin/export/listings.csv?from=31/01/2024', follow_redirects=True)
+    assert 'Export dates must look like 2024-01-31.' in response.get_data(as_text=True)
+
+
+def test_export_filters():
+    assert export_filters('2024-01-01', '2024-01-31', 'Items & Resources') == {
+        'created_from': datetime(2024, 1, 1), 'created_to': datetime(2024, 2, 1), 'category': 'Items & Resources'
+    }
+    assert export_filters() == {}
+    with pytest.raises(ValueError):
+        export_filters(category='Pets')
+
+
+def test_chunks_send_the_header_first_then_batch_lines(app_context):
+    chunks = list(export_chunks(['header\n'] + ['x' * 40000 + '\n'] * 3))
+    assert chunks[0] == 'header\n'
+    assert [len(chunk) for chunk in chunks[1:]] == [80002, 40001]
+
+
+def test_bulk_export_counts_rows(app, exported):
+    with app.app_context():
+        out = io.StringIO()
+        assert bulk_export('users', out, 'csv') == 2  # alice and bob; deleted users are left out
+        assert out.getvalue().splitlines()[0] == 'id,username,email,location,created_at'
+        assert bulk_export('feedback', io.StringIO(), 'jsonl', category='Items & Resources') == 1
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from app import db, deliver_outbox, notification_broker, Notification
+
+
+@pytest.fixture
+def short_streams(app):
+    # One catch-up pass and a heartbeat or two, then the stream ends
+    app.config.update(SSE_MAX_SECONDS=0.3, SSE_HEARTBEAT_SECONDS=0.1)
+    return app
+
+
+def parse_events(text):
+    """[(event, data, id)] of the events in a Server-Sent Events body (comments and retry lines skipped)."""
+    events = []
+    for block in text.split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if line and not line.startswith(':'))
+        if 'event' in fields:
+            events.append((fields['event'], json.loads(fields['data']), fields.get('id')))
+    return events
+
+
+def notify(app, recipient_id, messages):
+    with app.app_context():
+        notifications = [
+            Notification(recipient_id=recipient_id, notification_type='interest', message=message)
+            for message in messages
+        ]
+        db.session.add_all(notifications)
+        db.session.commit()
+        return [notification.id for notification in notifications]
+
+
+def test_fresh_stream_sends_the_count_but_not_old_notifications(short_streams, make_user, login):
+    alice = make_user('alice')
+    notify(short_streams, alice, ['Old news'])
+    response = login('alice').get('/notifications/stream')
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    body = response.get_data(as_text=True)
+    assert body.startswith('retry: ')
+    assert ': heartbeat' in body
+    assert parse_events(body) == [('unread', {'count': 0}, None)]
+
+
+def test_reconnect_replays_what_came_after_last_event_id(short_streams, make_user, login):
+    alice = make_user('alice')
+    first, second, third = notify(short_streams, alice, ['One', 'Two', 'Three'])
+    response = login('alice').get('/notifications/stream', headers={'Last-Event-ID': str(first)})
+
+    events = parse_events(response.get_data(as_text=True))
+    assert [(event, data.get('message'), event_id) for event, data, event_id in events] == [
+        ('notification', 'Two', str(second)), ('notification', 'Three', str(third)), ('unread', None, None),
+    ]
+    assert events[0][1]['url'] == f'/notifications/read/{second}'
+
+
+def test_delivery_wakes_an_open_stream(app, make_user, login, post_listing):
+    app.config.update(SSE_MAX_SECONDS=5, SSE_HEARTBEAT_SECONDS=5)
+    make_user('alice')
+    make_user('bob')
+    listing_id = post_listing(login('alice'), 'Bike repair')
+    login('bob').post(f'/listing/{listing_id}/interest', data={'message': 'Hi!'})
+
+    response = login('alice').get('/notifications/stream', buffered=False)
+    chunks = iter(response.response)
+    assert next(chunks).startswith(b'retry: ')
+    assert parse_events(next(chunks).decode()) == [('unread', {'count': 0}, None)]
+    assert notification_broker.count() == 1
+
+    # The outbox worker commits the notification; the stream hears about it at once
+    with app.app_context():
+        assert deliver_outbox() == 1
+    event, data, _ = parse_events(next(chunks).decode())[0]
+    assert (event, data['type']) == ('notification', 'interest')
+    assert 'bob is interested' in data['message']
+    assert parse_events(next(chunks).decode()) == [('unread', {'count': 1}, None)]
+
+    response.close()
+    assert notification_broker.count() == 0
+
+
+def test_only_regular_users_can_stream(app, login):
+    assert app.test_client().get('/notifications/stream').status_code == 302
+    assert login('admin', 'admin').get('/notifications/stream').status_code == 403
+
+
+def test_only_the_notifications_page_opens_a_stream(app, make_user, login):
+    make_user('alice')
+    client = login('alice')
+    assert 'EventSource' in client.get('/notifications').get_data(as_text=True)
+    for path in ('/', '/listings', '/my_listings'):
+        assert 'EventSource' not in client.get(path).get_data(as_text=True)
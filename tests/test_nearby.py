@@ -0,0 +1,53 @@
+import math
+import random
+import re
+
+from app import distance_km, geocode, geohash_cells, geohash_encode, KM_PER_DEGREE, MAX_COVERING_CELLS
+
+PLACES = ['Makati', 'Taguig', 'Manila', 'Pasig', 'Quezon City', 'Las Piñas', 'Cebu City']
+
+
+def test_geohash_matches_the_standard_encoding():
+    assert geohash_encode(57.64911, 10.40744) == 'u4pruydqq'
+    assert geohash_encode(-25.382708, -49.265506, precision=6) == '6gkzwg'
+
+
+def test_covering_cells_contain_every_point_of_the_circle():
+    rng = random.Random(7)
+    for latitude, longitude, radius_km in [(14.5547, 121.0244, 10), (14.5547, 121.0244, 0.5), (59.9, 10.7, 80)]:
+        cells = geohash_cells(latitude, longitude, radius_km)
+        assert len(cells) <= MAX_COVERING_CELLS
+        for _ in range(500):
+            bearing, distance = rng.uniform(0, 2 * math.pi), radius_km * math.sqrt(rng.random())
+            lat = latitude + distance / KM_PER_DEGREE * math.cos(bearing)
+            lng = longitude + distance / (KM_PER_DEGREE * math.cos(math.radians(latitude))) * math.sin(bearing)
+            assert geohash_encode(lat, lng).startswith(tuple(cells))
+
+
+def test_geocode_reads_free_text_locations(app_context):
+    quezon_city = geocode('Quezon City')
+    assert geocode('Brgy. 5, Quezon City, Metro Manila') == quezon_city
+    assert geocode('QC') == quezon_city
+    assert geocode('las pinas city') == geocode('Las Piñas')
+    assert geocode('Atlantis') is None and geocode('') is None
+
+
+def test_nearby_search_lists_listings_in_the_radius_nearest_first(app, make_user, login, post_listing):
+    make_user('alice')
+    client = login('alice')
+    for n, place in enumerate(PLACES):
+        post_listing(client, f'Help in {place}', f'Listing number {n} with its own words', location=place)
+
+    with app.app_context():
+        origin = geocode('Makati')
+        distances = {place: distance_km(*origin, *geocode(place)) for place in PLACES}
+    expected = sorted((place for place in PLACES if distances[place] <= 10), key=distances.get)
+    assert 'Cebu City' not in expected and len(expected) >= 3
+
+    page = app.test_client().get('/listings?near=Makati&radius=10').get_data(as_text=True)
+    assert re.findall(r'Help in ([^<]+)<', page) == expected
+
+
+def test_unknown_place_is_reported(app):
+    page = app.test_client().get('/listings?near=Atlantis').get_data(as_text=True)
+    assert 'We couldn\'t find "Atlantis"' in page
@@ -0,0 +1,107 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app import (
+    db, create_app, drop_expired_archive, migrate, next_month, prune_notifications, reconcile_unread_counts,
+    Notification, NotificationArchive, User
+)
+
+# Set to a scratch PostgreSQL database (it is wiped) to run the partitioning test
+POSTGRESQL_URL = os.environ.get('TEST_POSTGRESQL_URL')
+
+
+def add_notifications(recipient_id, rows):
+    """rows: [(days ago, is_read)]; returns the ids."""
+    notifications = [
+        Notification(recipient_id=recipient_id, notification_type='interest', message=f'{days} days ago',
+                     is_read=is_read, created_at=datetime.utcnow() - timedelta(days=days))
+        for days, is_read in rows
+    ]
+    db.session.add_all(notifications)
+    db.session.query(User).filter_by(id=recipient_id).update(
+        {User.unread_notifications: sum(not is_read for _, is_read in rows)})
+    db.session.commit()
+    return [notification.id for notification in notifications]
+
+
+def test_old_read_notifications_are_archived(app_context, make_user):
+    alice = make_user('alice')
+    old_read, old_unread, recent_read, older_read = add_notifications(
+        alice, [(120, True), (120, False), (10, True), (400, True)])
+
+    assert prune_notifications(days=90, action='archive', batch_size=1) == 2
+    assert {n.id for n in Notification.query} == {old_unread, recent_read}
+    archived = {row.id: row for row in NotificationArchive.query}
+    assert archived.keys() == {old_read, older_read}
+    assert (archived[old_read].recipient_id, archived[old_read].message) == (alice, '120 days ago')
+    assert reconcile_unread_counts() == 0  # unread notifications are never pruned
+
+    assert prune_notifications(days=90, action='archive') == 0
+
+
+def test_delete_action_skips_the_archive(app_context, make_user):
+    alice = make_user('alice')
+    add_notifications(alice, [(120, True), (10, True)])
+
+    assert prune_notifications(days=90, action='delete') == 1
+    assert Notification.query.count() == 1
+    assert NotificationArchive.query.count() == 0
+    with pytest.raises(ValueError):
+        prune_notifications(action='shred')
+
+
+def test_expired_archive_rows_are_dropped(app_context, make_user):
+    alice = make_user('alice')
+    add_notifications(alice, [(20, True), (200, True), (500, True)])
+    prune_notifications(days=0)
+
+    assert drop_expired_archive(months=12, batch_size=1) == 1
+    assert {row.message for row in NotificationArchive.query} == {'20 days ago', '200 days ago'}
+    assert drop_expired_archive(months=0) == 0
+
+
+@pytest.mark.skipif(not POSTGRESQL_URL, reason='TEST_POSTGRESQL_URL is not set')
+def test_archive_is_partitioned_by_month_on_postgresql():
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': POSTGRESQL_URL, 'SQLALCHEMY_BINDS': {}, 'TESTING': True,
+        'NOTIFICATION_ARCHIVE_PARTITIONS': True,
+    })
+    with app.app_context():
+        db.drop_all()
+        db.session.execute(text('DROP TABLE IF EXISTS schema_migration'))
+        db.session.commit()
+        migrate()
+        user = User(username='alice', email='alice@example.com', password='pw')
+        db.session.add(user)
+        db.session.commit()
+        add_notifications(user.id, [(20, True), (200, True), (500, True)])
+        prune_notifications(days=0)
+
+        def partitions():
+            return sorted(db.session.execute(text(
+                "SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent WHERE parent.relname = 'notification_archive'"
+            )).scalars())
+
+        def partition(days):
+            return f'notification_archive_{datetime.utcnow() - timedelta(days=days):%Y_%m}'
+
+        # One partition per month from the oldest archived row to the newest
+        created = partitions()
+        assert (created[0], created[-1]) == (partition(500), partition(20))
+        assert len(created) in (16, 17)
+
+        dropped = drop_expired_archive(months=12)
+        assert partition(500) not in partitions() and partition(200) in partitions()
+        assert dropped == len(created) - len(partitions())
+        assert NotificationArchive.query.count() == 2
+        db.session.remove()
+        db.drop_all()
+
+
+def test_next_month_rolls_over_the_year():
+    assert next_month(datetime(2025, 12, 1)) == datetime(2026, 1, 1)
+    assert next_month(datetime(2025, 1, 1)) == datetime(2025, 2, 1)
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+from app import db, create_notification, deliver_outbox, Notification, NotificationOutbox, User
+
+
+def unread_counter(user_id):
+    return db.session.query(User.unread_notifications).filter_by(id=user_id).scalar()
+
+
+def test_interest_is_delivered_exactly_once(app, make_user, login, post_listing):
+    alice, bob = make_user('alice'), make_user('bob')
+    listing_id = post_listing(login('alice'), 'Bike repair')
+    login('bob').post(f'/listing/{listing_id}/interest', data={'message': 'Hi!'})
+
+    with app.app_context():
+        # Routes only queue the notification; the worker (off in tests) delivers it
+        assert Notification.query.count() == 0
+        assert NotificationOutbox.query.count() == 1
+
+        assert deliver_outbox() == 1
+        assert deliver_outbox() == 0
+        notification = Notification.query.one()
+        assert (notification.recipient_id, notification.sender_id, notification.listing_id) == (alice, bob, listing_id)
+        assert NotificationOutbox.query.count() == 0
+        assert unread_counter(alice) == 1
+
+
+def test_redelivered_entry_is_skipped(app_context, make_user):
+    alice, bob = make_user('alice'), make_user('bob')
+    # As if a worker died after delivering but before the entry was removed
+    db.session.add(Notification(recipient_id=alice, sender_id=bob, notification_type='interest',
+                                message='bob is interested', idempotency_key='interest:1'))
+    db.session.query(User).filter_by(id=alice).update({User.unread_notifications: 1})
+    create_notification(alice, bob, None, 'interest', 'bob is interested', 'interest:1')
+    create_notification(alice, bob, None, 'interest', 'bob is interested again', 'interest:2')
+    db.session.commit()
+
+    assert deliver_outbox() == 2
+    assert sorted(key for (key,) in db.session.query(Notification.idempotency_key)) == ['interest:1', 'interest:2']
+    assert unread_counter(alice) == 2
+    assert NotificationOutbox.query.count() == 0
+
+
+def test_entries_about_deleted_users_are_dropped(app_context, make_user):
+    alice, bob = make_user('alice'), make_user('bob')
+    create_notification(alice, bob, None, 'interest', 'bob is interested', 'interest:1')
+    db.session.query(User).filter_by(id=bob).update({User.deleted_at: datetime.utcnow()})
+    db.session.commit()
+
+    assert deliver_outbox() == 1
+    assert Notification.query.count() == 0
+    assert NotificationOutbox.query.count() == 0
+    assert unread_counter(alice) == 0
+
+
+def test_failing_entry_does_not_hold_up_the_batch(app_context, make_user, monkeypatch):
+    alice, bob = make_user('alice'), make_user('bob')
+    create_notification(alice, bob, None, 'interest', 'first', 'interest:1')
+    create_notification(alice, bob, None, 'interest', 'second', 'interest:2')
+    db.session.commit()
+
+    # The first entry fails every time it is turned into a notification
+    original_init = Notification.__init__
+
+    def failing_init(self, **kwargs):
+        if kwargs['idempotency_key'] == 'interest:1':
+            raise ValueError('broken entry')
+        original_init(self, **kwargs)
+    monkeypatch.setattr(Notification, '__init__', failing_init)
+
+    assert deliver_outbox() == 2
+    assert [key for (key,) in db.session.query(Notification.idempotency_key)] == ['interest:2']
+    entry = NotificationOutbox.query.one()
+    assert (entry.idempotency_key, entry.attempts, entry.failed_at) == ('interest:1', 1, None)
+    assert 'broken entry' in entry.last_error
+    assert entry.available_at > datetime.utcnow()
+    assert unread_counter(alice) == 1
@@ -0,0 +1,110 @@
+import html
+import re
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+from sqlalchemy import text
+
+from app import db, decode_cursor, encode_cursor, paginate_keyset, Interest, Listing, Notification
+
+
+def test_cursor_round_trip(app_context):
+    keys = [Listing.created_at, Listing.id]
+    values = [datetime(2025, 1, 31, 12, 30, 45, 123456), 42]
+    cursor = encode_cursor(values)
+    assert '=' not in cursor
+    assert decode_cursor(cursor, keys) == values
+
+
+def test_invalid_cursors_are_ignored(app_context):
+    keys = [Listing.created_at, Listing.id]
+    assert decode_cursor('not a cursor', keys) is None
+    assert decode_cursor(encode_cursor([1]), keys) is None
+    assert decode_cursor(encode_cursor(['yesterday', 1]), keys) is None
+
+
+def page_at(app, url):
+    keys = [Listing.created_at, Listing.id]
+    with app.test_request_context(url):
+        page = paginate_keyset(Listing.query, keys)
+        return [listing.title for listing in page.items], page.next_url, page.prev_url
+
+
+def test_pages_cover_every_row_once(app, app_context, make_user):
+    user_id = make_user('alice')
+    created_at = datetime(2025, 1, 1)
+    # Ties on created_at are broken by id, so no row is skipped or repeated
+    db.session.add_all([
+        Listing(title=f'Listing {n}', category='Items & Resources', description='d', listing_type='Offering',
+                user_id=user_id, created_at=created_at if n < 4 else datetime(2025, 1, n))
+        for n in range(7)
+    ])
+    db.session.commit()
+
+    titles, url, pages = [], '/listings?per_page=3', []
+    while url:
+        page_titles, url, prev_url = page_at(app, url)
+        titles += page_titles
+        pages.append((page_titles, prev_url))
+    assert titles == ['Listing 6', 'Listing 5', 'Listing 4', 'Listing 3', 'Listing 2', 'Listing 1', 'Listing 0']
+    assert [len(page_titles) for page_titles, _ in pages] == [3, 3, 1]
+
+    # Going back from the last page returns the page before it
+    first_page, second_page = pages[0][0], pages[1][0]
+    assert pages[0][1] is None
+    assert page_at(app, pages[2][1])[0] == second_page
+    assert page_at(app, pages[1][1])[0] == first_page
+
+
+def test_cursor_links_keep_the_filters(app, app_context, make_user):
+    user_id = make_user('alice')
+    db.session.add_all([
+        Listing(title=f'Listing {n}', category='Items & Resources', description='d', listing_type='Offering',
+                user_id=user_id)
+        for n in range(3)
+    ])
+    db.session.commit()
+
+    _, next_url, _ = page_at(app, '/listings?per_page=2&category=Items+%26+Resources')
+    args = parse_qs(urlsplit(next_url).query)
+    assert args['category'] == ['Items & Resources']
+    assert args['per_page'] == ['2']
+    assert 'after' in args
+
+
+def query_plan(query):
+    statement = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    return ' '.join(row[-1] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {statement}')))
+
+
+def test_keyset_sorts_are_served_by_indexes(app_context):
+    plans = {
+        'ix_interest_listing_id_created_at_id':
+            Interest.query.filter_by(listing_id=1).order_by(Interest.created_at.desc(), Interest.id.desc()),
+        'ix_notification_recipient_id_created_at_id':
+            Notification.query.filter_by(recipient_id=1).order_by(Notification.created_at.desc(), Notification.id.desc()),
+        'ix_listing_created_at_id': Listing.query.order_by(Listing.created_at.desc(), Listing.id.desc()),
+    }
+    for index, query in plans.items():
+        plan = query_plan(query.limit(21))
+        assert index in plan and 'TEMP B-TREE' not in plan, plan
+
+
+def test_interests_page_through_one_listing_newest_first(app, make_user, login, post_listing):
+    make_user('alice')
+    listing_id = post_listing(login('alice'), 'Bike repair')
+    other_id = post_listing(login('alice'), 'Guitar lessons', 'Beginner lessons in the park')
+    for n in range(5):
+        make_user(f'user{n}')
+        client = login(f'user{n}')
+        client.post(f'/listing/{listing_id}/interest', data={'message': 'Hi!'})
+        client.post(f'/listing/{other_id}/interest', data={'message': 'Hi!'})
+
+    owner = login('alice')
+    url, usernames = f'/listing/{listing_id}/interests?per_page=2', []
+    while url:
+        page = owner.get(url).get_data(as_text=True)
+        usernames.append(re.findall(r'👤 (\w+)', page))
+        next_link = re.search(r'href="([^"]*after=[^"]*)"', page)
+        url = html.unescape(next_link.group(1)) if next_link else None
+    assert usernames == [['user4', 'user3'], ['user2', 'user1'], ['user0']]
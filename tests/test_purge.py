@@ -0,0 +1,116 @@
+from app import (
+    db, build_duplicate_index, deliver_outbox, purge_deleted, rebuild_dashboard_stats, rebuild_similar_listings,
+    reconcile_rating_totals, reconcile_unread_counts, DashboardStat, Listing, Notification, PurgeJob, SimilarityRefresh,
+    User
+)
+
+# Every column that refers to a user or a listing, with or without a foreign key
+USER_COLUMNS = ['user.id', 'listing.user_id', 'feedback.reviewer_id', 'interest.user_id',
+                'notification.recipient_id', 'notification.sender_id',
+                'notification_archive.recipient_id', 'notification_archive.sender_id']
+LISTING_COLUMNS = ['listing.id', 'listing.duplicate_of_id', 'feedback.listing_id', 'interest.listing_id',
+                   'notification.listing_id', 'listing_tag.listing_id', 'listing_term.listing_id',
+                   'listing_band.listing_id', 'similar_listing.listing_id', 'similar_listing.similar_id']
+
+
+def references(columns, ids):
+    """{column: rows} for the columns that still refer to one of `ids`."""
+    found = {}
+    for name in columns:
+        table, column = name.split('.')
+        column = db.metadata.tables[table].c[column]
+        rows = db.session.query(db.func.count()).select_from(column.table).filter(column.in_(ids)).scalar()
+        if rows:
+            found[name] = rows
+    return found
+
+
+def stored_totals():
+    rows = db.session.query(DashboardStat.key, DashboardStat.value).filter_by(metric='totals')
+    return {key: value for key, value in rows if value}  # a rebuild leaves out what is 0
+
+
+def purge_all():
+    while purge_deleted():
+        pass
+    assert PurgeJob.query.filter(PurgeJob.finished_at.is_(None)).count() == 0
+
+
+def build_community(app, make_user, login, post_listing):
+    """alice and bob post similar listings and react to each other's; returns their ids and listing ids."""
+    alice, bob = make_user('alice'), make_user('bob')
+    with app.app_context():
+        rebuild_dashboard_stats()
+
+    alice_client, bob_client = login('alice'), login('bob')
+    alice_listings = [post_listing(alice_client, f'Bike repair {n}', tags='bike,repair') for n in range(4)]
+    bob_listings = [post_listing(bob_client, f'Scooter repair {n}', tags='scooter,repair') for n in range(2)]
+    for listing_id in alice_listings:
+        bob_client.post(f'/listing/{listing_id}/interest', data={'message': 'Hi!'})
+        bob_client.post(f'/listing/{listing_id}/feedback', data={'rating': '5'})
+    for listing_id in bob_listings:
+        alice_client.post(f'/listing/{listing_id}/interest', data={'message': 'Hi!'})
+        alice_client.post(f'/listing/{listing_id}/feedback', data={'rating': '4'})
+
+    with app.app_context():
+        deliver_outbox()
+        rebuild_similar_listings()
+        build_duplicate_index()
+        assert references(LISTING_COLUMNS, alice_listings).keys() >= {
+            'listing_tag.listing_id', 'listing_term.listing_id', 'listing_band.listing_id',
+            'similar_listing.listing_id', 'notification.listing_id', 'listing.duplicate_of_id'
+        }
+    return alice, bob, alice_listings, bob_listings
+
+
+def assert_consistent():
+    """The counters match what is left, the way the reconcile commands would find them."""
+    totals = stored_totals()
+    rebuild_dashboard_stats()
+    assert stored_totals() == totals
+    assert reconcile_rating_totals() == (0, 0)
+    assert reconcile_unread_counts() == 0
+
+
+def test_deleting_a_user_leaves_nothing_behind(app, make_user, login, post_listing):
+    alice, bob, alice_listings, bob_listings = build_community(app, make_user, login, post_listing)
+
+    login('admin', 'admin').get(f'/admin/delete_user/{alice}')
+    with app.app_context():
+        purge_all()
+        assert references(USER_COLUMNS, [alice]) == {}
+        assert references(LISTING_COLUMNS, alice_listings) == {}
+
+        # bob keeps his listings; only alice's reviews of them are gone
+        assert Listing.query.filter(Listing.id.in_(bob_listings)).count() == 2
+        assert db.session.get(User, bob).rating_count == 0
+        assert_consistent()
+
+
+def test_deleting_a_listing_leaves_nothing_behind(app, make_user, login, post_listing):
+    alice, bob, alice_listings, bob_listings = build_community(app, make_user, login, post_listing)
+    deleted, *kept = alice_listings
+
+    login('alice').get(f'/delete_listing/{deleted}')
+    with app.app_context():
+        purge_all()
+        assert references(LISTING_COLUMNS, [deleted]) == {}
+        assert Listing.query.filter(Listing.id.in_(kept)).count() == 3
+        assert Notification.query.filter_by(recipient_id=alice).count() == 3 * 2
+        assert_consistent()
+
+
+def test_deleted_users_listings_disappear_before_the_purge(app, make_user, login, post_listing):
+    alice, bob, alice_listings, bob_listings = build_community(app, make_user, login, post_listing)
+    visitor = app.test_client()
+    assert 'Bike repair 0' in visitor.get('/listings').get_data(as_text=True)
+
+    login('admin', 'admin').get(f'/admin/delete_user/{alice}')
+    with app.app_context():
+        assert PurgeJob.query.filter(PurgeJob.finished_at.is_(None)).count() == 1
+        assert Listing.query.filter(Listing.id.in_(alice_listings), Listing.deleted_at.is_(None)).count() == 0
+        assert {listing_id for (listing_id,) in db.session.query(SimilarityRefresh.listing_id)} >= set(alice_listings)
+
+    page = visitor.get('/listings').get_data(as_text=True)
+    assert 'Bike repair' not in page and 'Scooter repair 0' in page
+    assert visitor.get(f'/listing/{alice_listings[0]}').status_code == 404
@@ -0,0 +1,38 @@
+import pytest
+
+import app as app_module
+from app import db, Notification, QueryBudgetExceeded
+
+
+@pytest.fixture
+def enforce_budgets(app):
+    app.config['ENFORCE_QUERY_BUDGETS'] = True
+    return app
+
+
+def test_route_over_its_budget_raises(enforce_budgets, monkeypatch):
+    client = enforce_budgets.test_client()
+    assert client.get('/listings').status_code == 200
+
+    monkeypatch.setattr(app_module.listings, 'query_budget', 0)
+    with pytest.raises(QueryBudgetExceeded, match='main.listings ran'):
+        client.get('/listings?category=Items+%26+Resources')  # not in the fragment cache yet
+
+
+def test_stream_is_budgeted_per_event(enforce_budgets, make_user, login, monkeypatch):
+    enforce_budgets.config.update(SSE_MAX_SECONDS=0.2, SSE_HEARTBEAT_SECONDS=0.05)
+    alice = make_user('alice')
+    with enforce_budgets.app_context():
+        db.session.add(Notification(recipient_id=alice, notification_type='interest', message='Hi'))
+        db.session.commit()
+    client = login('alice')
+
+    # The setup fits in the route's budget, however long the stream stays open
+    response = client.get('/notifications/stream', headers={'Last-Event-ID': '0'})
+    assert 'event: notification' in response.get_data(as_text=True)
+    response.close()
+
+    monkeypatch.setattr(app_module.notification_stream, 'event_query_budget', 1)
+    response = client.get('/notifications/stream', headers={'Last-Event-ID': '0'})
+    with pytest.raises(QueryBudgetExceeded, match=r'\(per event\)'):
+        response.get_data()
@@ -0,0 +1,92 @@
+import pytest
+
+import app as app_module
+from app import MemoryRateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A time.monotonic() that only moves when the test advances it."""
+    class Clock:
+        now = 1000.0
+
+        def advance(self, seconds):
+            self.now += seconds
+
+    clock = Clock()
+    monkeypatch.setattr(app_module.time, 'monotonic', lambda: clock.now)
+    return clock
+
+
+def test_bucket_allows_a_burst_then_refills_at_the_rate(clock):
+    limiter = MemoryRateLimiter(max_keys=100)
+    # 3 requests per 6 seconds: a token every 2 seconds
+    assert [limiter.take('ip:1', 3, 0.5) for _ in range(3)] == [(True, 0.0)] * 3
+    assert limiter.take('ip:1', 3, 0.5) == (False, 2.0)
+
+    clock.advance(1.5)
+    allowed, retry_after = limiter.take('ip:1', 3, 0.5)
+    assert not allowed and retry_after == pytest.approx(0.5)  # 0.75 tokens, and refused requests take none
+
+    clock.advance(0.5)
+    assert limiter.take('ip:1', 3, 0.5) == (True, 0.0)
+    assert limiter.take('ip:1', 3, 0.5)[0] is False
+
+
+def test_bucket_refills_up_to_its_capacity(clock):
+    limiter = MemoryRateLimiter(max_keys=100)
+    limiter.take('ip:1', 3, 0.5)
+    clock.advance(3600)
+    assert [limiter.take('ip:1', 3, 0.5)[0] for _ in range(4)] == [True, True, True, False]
+
+
+def test_buckets_are_per_key_and_least_recently_used_go_first(clock):
+    limiter = MemoryRateLimiter(max_keys=2)
+    assert limiter.take('ip:1', 1, 0.1)[0] is True
+    assert limiter.take('ip:2', 1, 0.1)[0] is True
+    assert limiter.take('ip:1', 1, 0.1)[0] is False
+    # ip:2 is now the least recently used and is dropped for ip:3; dropping it forgives it
+    assert limiter.take('ip:3', 1, 0.1)[0] is True
+    assert list(limiter.buckets) == ['ip:1', 'ip:3']
+    assert limiter.take('ip:2', 1, 0.1)[0] is True
+
+
+def test_route_answers_429_with_retry_after(app, clock):
+    client = app.test_client()
+    form = {'username': 'nobody', 'email': 'nobody@example.com', 'password': 'pw'}
+    # /register allows 5 per hour per address: one token every 720 seconds
+    statuses = [client.post('/register', data=dict(form, username=f'user{n}')).status_code for n in range(6)]
+    assert statuses == [302] * 5 + [429]
+    response = client.post('/register', data=form)
+    assert response.headers['Retry-After'] == '720'
+
+    clock.advance(720)
+    assert client.post('/register', data=dict(form, username='late', email='late@example.com')).status_code == 302
+    # Showing the form is never limited
+    assert client.get('/register').status_code == 200
+
+
+def test_login_attempts_are_limited_per_username(app, clock, make_user):
+    make_user('alice')
+    client = app.test_client()
+    # 10 per 5 minutes for a username, from however many addresses
+    statuses = [
+        client.post('/login', data={'username': 'Alice', 'password': 'wrong'},
+                    environ_base={'REMOTE_ADDR': f'10.0.0.{n}'}).status_code
+        for n in range(11)
+    ]
+    assert statuses == [200] * 10 + [429]
+    assert client.post('/login', data={'username': 'bob', 'password': 'wrong'}).status_code == 200
+
+
+def test_trusted_proxy_forwards_the_client_address(app, clock):
+    app.config['RATE_LIMIT_TRUSTED_PROXIES'] = 1
+    client = app.test_client()
+
+    def register(n, address):
+        form = {'username': f'user{n}', 'email': f'user{n}@example.com', 'password': 'pw'}
+        return client.post('/register', data=form, headers={'X-Forwarded-For': f'6.6.6.6, {address}'}).status_code
+
+    assert [register(n, '10.0.0.1') for n in range(6)] == [302] * 5 + [429]
+    # The address the proxy appended counts, not the one the client claimed
+    assert register(6, '10.0.0.2') == 302
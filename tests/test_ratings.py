@@ -0,0 +1,47 @@
+from app import db, reconcile_rating_totals, Feedback, Listing, User
+
+
+def rating_totals(app, listing_id, owner_id):
+    with app.app_context():
+        return (
+            db.session.query(Listing.rating_sum, Listing.rating_count).filter_by(id=listing_id).one(),
+            db.session.query(User.rating_sum, User.rating_count).filter_by(id=owner_id).one(),
+        )
+
+
+def test_feedback_keeps_rating_totals(app, make_user, login, post_listing):
+    alice = make_user('alice')
+    make_user('bob')
+    make_user('carol')
+    listing_id = post_listing(login('alice'), 'Bike repair')
+
+    login('bob').post(f'/listing/{listing_id}/feedback', data={'rating': '4'})
+    carol = login('carol')
+    carol.post(f'/listing/{listing_id}/feedback', data={'rating': '5'})
+    carol.post(f'/listing/{listing_id}/feedback', data={'rating': '1'})  # one review per user
+    assert rating_totals(app, listing_id, alice) == ((9, 2), (9, 2))
+
+    with app.app_context():
+        feedback_id = db.session.query(Feedback.id).filter_by(rating=5).scalar()
+    carol.get(f'/feedback/{feedback_id}/delete')
+    assert rating_totals(app, listing_id, alice) == ((4, 1), (4, 1))
+
+    # The listing page and the profile show the stored totals
+    assert '4.0/5' in carol.get(f'/listing/{listing_id}').get_data(as_text=True)
+    assert '4.0' in carol.get(f'/profile/{alice}').get_data(as_text=True)
+
+
+def test_reconcile_rating_totals(app, make_user, login, post_listing):
+    alice = make_user('alice')
+    make_user('bob')
+    listing_id = post_listing(login('alice'), 'Bike repair')
+    login('bob').post(f'/listing/{listing_id}/feedback', data={'rating': '3'})
+
+    with app.app_context():
+        db.session.query(Listing).filter_by(id=listing_id).update({Listing.rating_sum: 10, Listing.rating_count: 4})
+        db.session.query(User).filter_by(id=alice).update({User.rating_sum: 0, User.rating_count: 0})
+        db.session.commit()
+
+        assert reconcile_rating_totals() == (1, 1)
+        assert reconcile_rating_totals() == (0, 0)
+    assert rating_totals(app, listing_id, alice) == ((3, 1), (3, 1))
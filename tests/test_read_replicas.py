@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import insert
+
+from app import db, create_app, create_admin_accounts, engine_options, migrate, InstrumentedQueuePool, Listing, User
+
+
+@pytest.fixture
+def replicated(tmp_path):
+    """An app with a replica that has a listing the primary does not (as if the primary deleted it)."""
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/primary.db',
+        'SQLALCHEMY_BINDS': {'replica_1': f'sqlite:///{tmp_path}/replica.db'},
+        'TESTING': True,
+    })
+    with app.app_context():
+        migrate()
+        create_admin_accounts()
+        db.session.add(User(username='alice', email='alice@example.com', password='pw'))
+        db.session.commit()
+
+        replica = db.engines['replica_1']
+        db.metadata.create_all(replica)
+        with replica.begin() as connection:
+            connection.execute(insert(User).values(id=50, username='ghost', email='ghost@example.com', password='pw'))
+            connection.execute(insert(Listing).values(
+                id=99, title='Stale listing', category='Items & Resources', description='d', listing_type='Offering',
+                user_id=50
+            ))
+    return app
+
+
+def test_read_views_query_the_replica(replicated):
+    visitor = replicated.test_client()
+    assert 'Stale listing' in visitor.get('/listing/99').get_data(as_text=True)
+    assert visitor.get('/profile/50').status_code == 200
+    # Cached fragments are the exception: they are rendered from the primary
+    assert 'Stale listing' not in visitor.get('/listings').get_data(as_text=True)
+
+
+def test_logged_in_user_is_loaded_from_the_primary(replicated):
+    alice = replicated.test_client()
+    alice.post('/login', data={'username': 'alice', 'password': 'pw'})
+    # alice only exists on the primary, yet the replica-backed page knows her
+    page = alice.get('/listing/99').get_data(as_text=True)
+    assert 'Stale listing' in page and 'alice' in page
+
+
+def test_writers_stick_to_the_primary(replicated):
+    alice = replicated.test_client()
+    alice.post('/login', data={'username': 'alice', 'password': 'pw'})
+    alice.post('/create_listing', data={
+        'title': 'Ladder to lend', 'category': 'Items & Resources', 'description': 'A tall ladder',
+        'listing_type': 'Offering',
+    })
+    with alice.session_transaction() as session:
+        assert session['read_primary_until'] > 0
+    assert alice.get('/listing/99').status_code == 404
+    assert 'Ladder to lend' in alice.get('/listings').get_data(as_text=True)
+
+    # Everyone else keeps reading the replica
+    assert replicated.test_client().get('/listing/99').status_code == 200
+
+
+def test_pool_settings_come_from_the_environment(monkeypatch):
+    assert engine_options('sqlite://') == {}
+    monkeypatch.setenv('DB_POOL_SIZE', '3')
+    monkeypatch.setenv('DB_POOL_PRE_PING', '0')
+    options = engine_options('postgresql://localhost/helping_hand')
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert (options['pool_size'], options['max_overflow'], options['pool_pre_ping']) == (3, 10, False)
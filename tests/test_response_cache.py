@@ -0,0 +1,102 @@
+import app as app_module
+from app import db, bump_cache_version, create_app, get_cache, migrate, Listing, MemoryCache, User
+
+
+def add_listing(app, user_id, title):
+    """Insert a listing behind the app's back (no version bump)."""
+    with app.app_context():
+        db.session.add(Listing(title=title, category='Items & Resources', description='d', listing_type='Offering',
+                               user_id=user_id))
+        db.session.commit()
+
+
+def test_unchanged_pages_revalidate_with_304(app, make_user, login, post_listing):
+    make_user('alice')
+    visitor = app.test_client()
+    for path in ('/', '/listings'):
+        first = visitor.get(path)
+        assert first.status_code == 200 and first.headers['ETag'].startswith('W/')
+        assert 'no-cache' in first.headers['Cache-Control'] and 'private' in first.headers['Cache-Control']
+
+        again = visitor.get(path, headers={'If-None-Match': first.headers['ETag']})
+        assert again.status_code == 304 and again.data == b''
+        since = visitor.get(path, headers={'If-Modified-Since': first.headers['Last-Modified']})
+        assert since.status_code == 304
+
+    # A write bumps the version: the old validators no longer match
+    etag = visitor.get('/listings').headers['ETag']
+    post_listing(login('alice'), 'Bike repair')
+    changed = visitor.get('/listings', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and 'Bike repair' in changed.get_data(as_text=True)
+    assert changed.headers['ETag'] != etag
+
+
+def test_logged_in_etags_cover_the_user(app, make_user, login, post_listing):
+    make_user('alice')
+    make_user('bob')
+    alice, bob = login('alice'), login('bob')
+    alice.get('/'), bob.get('/')  # shows the welcome message
+    alice_etag, bob_etag = alice.get('/').headers['ETag'], bob.get('/').headers['ETag']
+    assert alice_etag != bob_etag
+    assert 'Last-Modified' not in alice.get('/').headers
+    assert bob.get('/', headers={'If-None-Match': alice_etag}).status_code == 200
+
+    # A pending flash message is shown once, so that page is never validated
+    post_listing(alice, 'Bike repair')
+    flashed = alice.get('/')
+    assert 'ETag' not in flashed.headers and 'no-store' in flashed.headers['Cache-Control']
+    assert 'ETag' in alice.get('/').headers
+
+
+def test_fragments_are_cached_until_the_version_changes(app, make_user):
+    alice = make_user('alice')
+    visitor = app.test_client()
+    assert 'Bike repair' not in visitor.get('/listings').get_data(as_text=True)
+
+    add_listing(app, alice, 'Bike repair')
+    assert 'Bike repair' not in visitor.get('/listings').get_data(as_text=True)
+    assert 'Bike repair' in visitor.get('/listings?type=Offering').get_data(as_text=True)  # its own key
+
+    with app.app_context():
+        bump_cache_version()
+        assert get_cache().get_version('listings') > 0
+    assert 'Bike repair' in visitor.get('/listings').get_data(as_text=True)
+
+
+def test_fragments_are_rendered_from_the_primary(tmp_path):
+    # The replica has the schema but none of the rows yet
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/primary.db',
+        'SQLALCHEMY_BINDS': {'replica_1': f'sqlite:///{tmp_path}/replica.db'},
+        'TESTING': True,
+    })
+    with app.app_context():
+        migrate()
+        db.metadata.create_all(db.engines['replica_1'])
+        user = User(username='alice', email='alice@example.com', password='pw')
+        db.session.add(user)
+        db.session.commit()
+        add_listing(app, user.id, 'Bike repair')
+        bump_cache_version()
+
+    visitor = app.test_client()
+    assert 'Bike repair' in visitor.get('/').get_data(as_text=True)
+    assert 'Bike repair' in visitor.get('/listings').get_data(as_text=True)
+
+
+def test_memory_cache_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(app_module.time, 'monotonic', lambda: now[0])
+    cache = MemoryCache(max_entries=2, ttl=10)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # now the most recently used
+    cache.set('c', 3)
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+
+    now[0] += 11
+    assert cache.get('a') is None
+
+    version = cache.get_version('listings')
+    cache.bump_version('listings')
+    assert cache.get_version('listings') > version
@@ -0,0 +1,60 @@
+from app import db, search_listings, Listing
+
+
+def search(app, text):
+    """Titles of the listings matching `text`, best match first."""
+    with app.app_context():
+        query, score = search_listings(Listing.query, text)
+        return [listing.title for listing in query.order_by(score.desc(), Listing.id)]
+
+
+def test_every_term_must_match_and_the_last_one_as_a_prefix(app, make_user, login, post_listing):
+    make_user('alice')
+    client = login('alice')
+    post_listing(client, 'Bike repair', 'Flat tyres and brakes fixed on weekends')
+    post_listing(client, 'Guitar lessons', 'Beginner lessons in the park', tags='music, bikes')
+    post_listing(client, 'Garden help', 'Weeding and repairs around the garden shed')
+
+    assert search(app, 'repair') == ['Bike repair', 'Garden help']  # stemmed: repairs matches too
+    assert search(app, 'repair bik') == ['Bike repair']
+    assert search(app, 'bik') == ['Bike repair', 'Guitar lessons']  # tags are indexed as well
+    assert search(app, 'lessons music') == ['Guitar lessons']
+    assert search(app, 'piano') == []
+
+
+def test_more_relevant_listings_rank_first(app, make_user, login, post_listing):
+    make_user('alice')
+    client = login('alice')
+    post_listing(client, 'Moving boxes', 'Cardboard boxes, and a tutoring book for free')
+    post_listing(client, 'Maths tutoring', 'Tutoring in maths and physics, tutoring online too')
+
+    assert search(app, 'tutoring') == ['Maths tutoring', 'Moving boxes']
+
+
+def test_edits_and_deletes_keep_the_index_in_step(app, make_user, login, post_listing):
+    make_user('alice')
+    client = login('alice')
+    listing_id = post_listing(client, 'Bike repair', 'Flat tyres fixed')
+
+    client.post(f'/edit_listing/{listing_id}', data={
+        'title': 'Scooter repair', 'category': 'Skills & Services', 'description': 'Flat tyres fixed',
+        'listing_type': 'Offering'
+    })
+    assert search(app, 'bike') == []
+    assert search(app, 'scooter') == ['Scooter repair']
+
+    with app.app_context():
+        db.session.query(Listing).filter_by(id=listing_id).delete()
+        db.session.commit()
+    assert search(app, 'scooter') == []
+
+
+def test_listings_page_shows_only_matches(app, make_user, login, post_listing):
+    make_user('alice')
+    client = login('alice')
+    post_listing(client, 'Bike repair', 'Flat tyres and brakes fixed on weekends')
+    post_listing(client, 'Guitar lessons', 'Beginner lessons in the park')
+
+    page = app.test_client().get('/listings?search=guitar').get_data(as_text=True)
+    assert 'Guitar lessons' in page
+    assert 'Bike repair' not in page
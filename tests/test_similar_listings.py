@@ -0,0 +1,110 @@
+import re
+
+import pytest
+
+from app import (
+    compute_similar_listings, db, rebuild_similar_listings, refresh_similar_listings, similar_listings,
+    similarity_terms, tfidf_weights, Listing, SimilarityRefresh
+)
+
+LISTINGS = [
+    ('Bike repair', 'Puncture repair, brake and gear tuning for bikes', 'bikes, repair'),
+    ('Bicycle tune-up', 'Gear and brake tuning for road bikes and bicycle wheels', 'bikes'),
+    ('Guitar lessons', 'Beginner guitar and music theory lessons', 'music, lessons'),
+    ('Piano lessons', 'Piano and music theory lessons for beginners', 'music, lessons'),
+]
+
+
+def add_listings(user_id):
+    listings = [
+        Listing(title=title, category='Skills & Services', listing_type='Offering', description=description,
+                tags=tags, user_id=user_id)
+        for title, description, tags in LISTINGS
+    ]
+    db.session.add_all(listings)
+    db.session.commit()
+    return [listing.id for listing in listings]
+
+
+def titles(listings):
+    return [listing.title for listing in listings]
+
+
+def test_similarity_terms_weighs_title_and_tags():
+    counts = similarity_terms('Bike repair', 'a bike to fix', 'Skills & Services', 'repair')
+    assert counts['bike'] == 3
+    assert counts['repair'] == 4
+    assert counts['category:Skills & Services'] == 1
+    assert 'a' not in counts
+
+
+def test_matrix_scores_match_tfidf_cosine():
+    documents = [
+        (listing_id, similarity_terms(title, description, 'Skills & Services', tags))
+        for listing_id, (title, description, tags) in enumerate(LISTINGS, start=1)
+    ]
+    document_frequency = {}
+    for _, counts in documents:
+        for term in counts:
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+    weights = [tfidf_weights(counts, document_frequency, len(documents)) for _, counts in documents]
+
+    vectors, neighbours = compute_similar_listings(documents, k=2, max_term_listings=len(documents), block_size=3)
+
+    for vector, expected in zip(vectors, weights):
+        assert vector == pytest.approx(expected)
+    for listing_id, nearest in enumerate(neighbours, start=1):
+        assert len(nearest) == 2
+        assert listing_id not in [similar_id for similar_id, _ in nearest]
+        for similar_id, score in nearest:
+            expected = sum(weight * weights[similar_id - 1].get(term, 0) for term, weight in weights[listing_id - 1].items())
+            assert score == pytest.approx(expected)
+    assert neighbours[0][0][0] == 2
+    assert neighbours[2][0][0] == 4
+
+
+def test_terms_in_too_many_listings_are_not_compared():
+    documents = [(1, {'common': 1, 'alpha': 1}), (2, {'common': 1, 'beta': 1}), (3, {'common': 1, 'alpha': 1})]
+    _, neighbours = compute_similar_listings(documents, k=5, max_term_listings=2)
+    assert [similar_id for similar_id, _ in neighbours[0]] == [3]
+    assert neighbours[1] == []
+
+
+def test_rebuild_stores_nearest_first(app_context, make_user):
+    bike, bicycle, guitar, piano = add_listings(make_user('alice'))
+    assert rebuild_similar_listings() == 4
+
+    assert titles(similar_listings(bike))[0] == 'Bicycle tune-up'
+    assert titles(similar_listings(guitar))[0] == 'Piano lessons'
+    assert bike not in [listing.id for listing in similar_listings(bike)]
+
+
+def test_edits_are_refreshed_from_the_queue(app, make_user, login, post_listing):
+    with app.app_context():
+        bike, bicycle, guitar, piano = add_listings(make_user('alice'))
+        rebuild_similar_listings()
+
+    client = login('alice')
+    ukulele = post_listing(client, 'Ukulele lessons', description='Ukulele and music theory lessons for beginners',
+                           tags='music, lessons')
+    client.get(f'/delete_listing/{piano}')
+
+    with app.app_context():
+        assert {entry.listing_id for entry in SimilarityRefresh.query} == {ukulele, piano}
+        assert refresh_similar_listings() == 2
+        assert SimilarityRefresh.query.count() == 0
+
+        assert titles(similar_listings(ukulele))[0] == 'Guitar lessons'
+        assert titles(similar_listings(guitar))[0] == 'Ukulele lessons'
+        assert 'Piano lessons' not in titles(similar_listings(guitar, limit=10))
+
+
+def test_listing_page_shows_similar_listings(app, make_user, login):
+    with app.app_context():
+        bike, bicycle, guitar, piano = add_listings(make_user('alice'))
+        rebuild_similar_listings()
+
+    client = login('alice')
+    page = client.get(f'/listing/{bike}').get_data(as_text=True)
+    section = page[page.index('Similar Listings'):]
+    assert re.findall(r'<h3>([^<]+)</h3>', section)[0] == 'Bicycle tune-up'
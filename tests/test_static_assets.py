@@ -0,0 +1,77 @@
+import gzip
+import re
+import shutil
+import types
+
+import pytest
+from flask import url_for
+
+import app as app_module
+from app import build_static
+
+
+@pytest.fixture
+def static_app(app, tmp_path):
+    """The app serving a scratch copy of static/, so builds do not touch the checkout."""
+    shutil.copytree(app.static_folder, tmp_path / 'static')
+    app.static_folder = str(tmp_path / 'static')
+    return app
+
+
+def test_pages_are_compressed_for_clients_that_accept_it(app, make_user, login, post_listing):
+    make_user('alice')
+    post_listing(login('alice'), 'Bike repair')
+    client = app.test_client()
+    plain = client.get('/listings')
+    assert 'Content-Encoding' not in plain.headers
+
+    compressed = client.get('/listings', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert gzip.decompress(compressed.data) == plain.data
+    assert len(compressed.data) < len(plain.data)
+
+
+def test_brotli_is_preferred_when_installed(app, monkeypatch):
+    fake = types.SimpleNamespace(compress=lambda data, quality: b'brotli' + data[:100])
+    monkeypatch.setattr(app_module, 'brotli_module', lambda: fake)
+    response = app.test_client().get('/listings', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert response.data.startswith(b'brotli')
+
+
+def test_streamed_responses_are_left_alone(app, login):
+    response = login('admin', 'admin').get('/admin/export/listings.csv', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data(as_text=True).startswith('id,')
+
+
+def test_built_assets_are_fingerprinted_and_precompressed(static_app):
+    client = static_app.test_client()
+    with static_app.test_request_context():
+        assert url_for('static', filename='css/style.css') == '/static/css/style.css'
+    with open(f'{static_app.static_folder}/css/style.css', 'rb') as f:
+        original = f.read()
+
+    with static_app.app_context():
+        sizes = dict((name, (size, gzip_size)) for name, size, gzip_size, _ in build_static())
+    assert sizes['css/style.css'][1] < sizes['css/style.css'][0]
+    with static_app.test_request_context():
+        url = url_for('static', filename='css/style.css')
+    assert re.fullmatch(r'/static/build/css/style\.[0-9a-f]{12}\.css', url)
+    assert url in client.get('/login').get_data(as_text=True)
+
+    response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'immutable' in response.headers['Cache-Control'] and 'public' in response.headers['Cache-Control']
+    assert gzip.decompress(response.data) == original
+    response.close()
+
+    response = client.get(url)
+    assert 'Content-Encoding' not in response.headers and response.data == original
+    response.close()
+
+    # The unbuilt file is still served, without the long-lived caching
+    response = client.get('/static/css/style.css')
+    assert response.data == original and 'immutable' not in response.headers.get('Cache-Control', '')
+    response.close()
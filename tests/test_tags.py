@@ -0,0 +1,76 @@
+import re
+from urllib.parse import parse_qs, urlsplit
+
+from sqlalchemy import event
+
+from app import db, facet_url, filter_by_tags, index_listing_tags, listing_facets, parse_tags, Listing, Tag
+
+LISTINGS = [
+    # (title, category, listing_type, tags)
+    ('Bike repair', 'Skills & Services', 'Offering', 'Bikes, repair'),
+    ('Scooter repair', 'Skills & Services', 'Requesting', 'repair, scooters'),
+    ('Spare bike', 'Items & Resources', 'Offering', 'bikes'),
+    ('Toolbox', 'Items & Resources', 'Offering', 'tools, REPAIR '),
+]
+
+
+def add_listings(user_id):
+    listings = [
+        Listing(title=title, category=category, listing_type=listing_type, tags=tags, description='d', user_id=user_id)
+        for title, category, listing_type, tags in LISTINGS
+    ]
+    db.session.add_all(listings)
+    db.session.flush()
+    index_listing_tags([(listing.id, listing.tags) for listing in listings])
+    db.session.commit()
+
+
+def test_parse_tags_normalizes():
+    assert parse_tags('Tutoring, MATH ,  math,, high   school') == ['tutoring', 'math', 'high school']
+    assert parse_tags(None) == []
+
+
+def test_each_facet_ignores_its_own_filter(app_context, make_user):
+    add_listings(make_user('alice'))
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    facets = listing_facets(Listing.query, category='Items & Resources', listing_type='Offering')
+
+    assert len(statements) == 1
+    assert facets['category'] == [('Items & Resources', 2), ('Skills & Services', 1)]
+    assert facets['type'] == [('Offering', 2)]
+    assert facets['tag'] == [('bikes', 1), ('repair', 1), ('tools', 1)]
+
+    facets = listing_facets(filter_by_tags(Listing.query, ['repair']))
+    assert facets['category'] == [('Skills & Services', 2), ('Items & Resources', 1)]
+    assert facets['tag'][0] == ('repair', 3)
+
+
+def test_tag_filters_need_every_tag_and_follow_edits(app, make_user, login, post_listing):
+    make_user('alice')
+    client = login('alice')
+    listing_id = post_listing(client, 'Bike repair', tags='Bikes, Repair')
+    post_listing(client, 'Spare bike', 'An old bike to give away', tags='bikes')
+
+    def titles(query):
+        return re.findall(r'<h3>([^<]+)</h3>', app.test_client().get(f'/listings?{query}').get_data(as_text=True))
+
+    assert sorted(titles('tag=bikes')) == ['Bike repair', 'Spare bike']
+    assert titles('tag=bikes&tag=repair') == ['Bike repair']
+
+    client.post(f'/edit_listing/{listing_id}', data={
+        'title': 'Bike repair', 'category': 'Skills & Services', 'listing_type': 'Offering',
+        'description': 'I fix bikes and scooters in the neighbourhood on weekends', 'tags': 'scooters'
+    })
+    assert titles('tag=repair') == []
+    assert titles('tag=scooters') == ['Bike repair']
+    with app.app_context():
+        assert Tag.query.filter_by(name='scooters').count() == 1
+
+
+def test_facet_links_toggle_values(app):
+    with app.test_request_context('/listings?tag=bikes&category=Items+%26+Resources&after=abc'):
+        args = parse_qs(urlsplit(facet_url('tag', 'repair')).query)
+        assert args == {'tag': ['bikes', 'repair'], 'category': ['Items & Resources']}
+        assert 'tag' not in parse_qs(urlsplit(facet_url('tag', 'bikes')).query)
+        assert parse_qs(urlsplit(facet_url('category', 'Skills & Services')).query)['category'] == ['Skills & Services']
@@ -0,0 +1,63 @@
+from app import db, reconcile_unread_counts, Notification, User
+
+
+def unread(app, user_id):
+    with app.app_context():
+        stored = db.session.query(User.unread_notifications).filter_by(id=user_id).scalar()
+        actual = Notification.query.filter_by(recipient_id=user_id, is_read=False).count()
+        return stored, actual
+
+
+def notify(app, recipient_id, count):
+    with app.app_context():
+        db.session.add_all([
+            Notification(recipient_id=recipient_id, notification_type='interest', message=f'Notification {n}')
+            for n in range(count)
+        ])
+        db.session.query(User).filter_by(id=recipient_id).update({User.unread_notifications: count})
+        db.session.commit()
+        return [notification_id for (notification_id,) in db.session.query(Notification.id).order_by(Notification.id)]
+
+
+def test_reading_a_notification_twice_counts_once(app, make_user, login):
+    alice = make_user('alice')
+    first, second, third = notify(app, alice, 3)
+    client = login('alice')
+
+    client.get(f'/notifications/read/{first}')
+    client.get(f'/notifications/read/{first}')
+    assert unread(app, alice) == (2, 2)
+
+    client.get(f'/notifications/delete/{first}')  # already read: the counter stays
+    client.get(f'/notifications/delete/{second}')
+    assert unread(app, alice) == (1, 1)
+
+    client.get('/notifications/read_all')
+    client.get(f'/notifications/read/{third}')
+    assert unread(app, alice) == (0, 0)
+
+
+def test_reconcile_unread_counts(app, make_user):
+    alice, bob = make_user('alice'), make_user('bob')
+    notify(app, alice, 2)
+    with app.app_context():
+        db.session.query(User).filter_by(id=bob).update({User.unread_notifications: 5})
+        db.session.commit()
+
+        assert reconcile_unread_counts() == 1
+        assert reconcile_unread_counts() == 0
+    assert unread(app, alice) == (2, 2)
+    assert unread(app, bob) == (0, 0)
+
+
+def test_badge_shows_the_stored_count(app, make_user, login):
+    alice = make_user('alice')
+    first, _ = notify(app, alice, 2)
+    client = login('alice')
+    assert '<span class="notification-badge">2</span>' in client.get('/my_listings').get_data(as_text=True)
+
+    client.get(f'/notifications/read/{first}')
+    assert '<span class="notification-badge">1</span>' in client.get('/my_listings').get_data(as_text=True)
+
+    client.get('/notifications/read_all')
+    assert 'notification-badge' not in client.get('/my_listings').get_data(as_text=True)
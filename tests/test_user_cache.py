@@ -0,0 +1,58 @@
+from sqlalchemy import event
+
+from app import db, create_app, deliver_outbox, get_user_cache, load_user, CachedUser
+
+
+def count_statements():
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_load_user_caches_a_detached_snapshot(app_context, make_user):
+    alice = make_user('alice')
+    statements = count_statements()
+
+    user = load_user(f'user_{alice}')
+    assert isinstance(user, CachedUser)
+    assert (user.id, user.username, user.is_admin, user.get_id()) == (alice, 'alice', False, f'user_{alice}')
+    assert len(statements) == 1
+
+    assert load_user(f'user_{alice}') is user
+    assert len(statements) == 1
+
+    admin = load_user('admin_1')
+    assert admin.is_admin and admin.username == 'admin'
+    assert load_user('user_999') is None
+
+
+def test_cache_lifetime_depends_on_cross_process_evictions():
+    for pubsub, ttl in [('memory', 5), ('postgresql', 60)]:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SQLALCHEMY_BINDS': {}, 'TESTING': True, 'NOTIFICATION_PUBSUB': pubsub,
+        })
+        with app.app_context():
+            assert get_user_cache().ttl == ttl
+
+
+def test_notifications_refresh_the_cached_badge(app, make_user, login, post_listing):
+    make_user('alice')
+    make_user('bob')
+    alice = login('alice')
+    listing_id = post_listing(alice, 'Bike repair')
+    assert 'notification-badge' not in alice.get('/my_listings').get_data(as_text=True)
+
+    login('bob').post(f'/listing/{listing_id}/interest', data={'message': 'Hi!'})
+    with app.app_context():
+        deliver_outbox()
+    assert '<span class="notification-badge">1</span>' in alice.get('/my_listings').get_data(as_text=True)
+
+
+def test_deleted_user_is_signed_out_at_once(app, make_user, login):
+    alice_id = make_user('alice')
+    alice = login('alice')
+    assert alice.get('/my_listings').status_code == 200
+
+    login('admin', 'admin').get(f'/admin/delete_user/{alice_id}')
+    response = alice.get('/my_listings')
+    assert response.status_code == 302 and '/login' in response.headers['Location']
@@ -0,0 +1,20 @@
+"""
+Production entry point for The Helping Hand.
+
+    flask --app app migrate
+    flask --app app seed
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+gunicorn.conf.py loads this module once in the master process (preload_app), so
+the app is created and every template compiled before the workers are forked.
+Schema changes and seed data are never applied here; run the commands above.
+"""
+import time
+
+started = time.perf_counter()
+
+from app import create_app, preload  # noqa: E402
+
+app = create_app()
+import_seconds = time.perf_counter() - started
+preload_seconds = preload(app)